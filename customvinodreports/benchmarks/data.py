@@ -0,0 +1,407 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+"""
+Synthetic ERP data for the report benchmarks.
+
+Rows are written straight into the tables with `bulk_insert`, bypassing
+controllers, so millions of lines load in minutes. That leaves the site
+inconsistent for anything but reading, so only run it on a disposable
+benchmark site. Every generated name starts with PREFIX, which is how `clear`
+finds them again.
+"""
+
+import random
+
+import frappe
+from frappe.utils import add_days, getdate, now, nowdate
+from frappe.utils.nestedset import rebuild_tree
+
+PREFIX = "BENCH-"
+
+VOLUMES = {
+	"small": {
+		"customers": 500,
+		"sub_groups": 10,
+		"customer_group_depth": 3,
+		"items": 1000,
+		"item_group_depth": 4,
+		"item_group_fanout": 4,
+		"warehouses": 5,
+		"invoices": 20000,
+		"lines_per_invoice": 5,
+		"stock_ledger_entries": 50000,
+		"landed_cost_vouchers": 500,
+		"years": 2,
+	},
+	"medium": {
+		"customers": 5000,
+		"sub_groups": 50,
+		"customer_group_depth": 4,
+		"items": 10000,
+		"item_group_depth": 5,
+		"item_group_fanout": 5,
+		"warehouses": 20,
+		"invoices": 200000,
+		"lines_per_invoice": 6,
+		"stock_ledger_entries": 500000,
+		"landed_cost_vouchers": 5000,
+		"years": 3,
+	},
+	"large": {
+		"customers": 20000,
+		"sub_groups": 200,
+		"customer_group_depth": 5,
+		"items": 50000,
+		"item_group_depth": 6,
+		"item_group_fanout": 5,
+		"warehouses": 50,
+		"invoices": 1000000,
+		"lines_per_invoice": 8,
+		"stock_ledger_entries": 3000000,
+		"landed_cost_vouchers": 20000,
+		"years": 3,
+	},
+}
+
+# headers (and their lines) written per batch; each batch is committed
+BATCH_SIZE = 5000
+
+# every table written to, children before their parents
+GENERATED_DOCTYPES = (
+	"Landed Cost Item",
+	"Landed Cost Voucher",
+	"Stock Ledger Entry",
+	"Bin",
+	"Sales Invoice Item",
+	"Sales Invoice",
+	"Delivery Note Item",
+	"Delivery Note",
+	"Sales Order Item",
+	"Sales Order",
+	"Item",
+	"Customer",
+	"Warehouse",
+	"Item Group",
+	"Customer Group",
+)
+
+SALES_DOC_TYPES = ("Sales Invoice", "Delivery Note", "Sales Order")
+ORDER_TYPES = ("Sales", "Maintenance", "Shopping Cart")
+ITEM_TYPES = ("Finished Goods", "Raw Material", "Consumable")
+
+
+def get_volumes(scale="small", overrides=None):
+	volumes = dict(VOLUMES[scale])
+	for key, value in (overrides or {}).items():
+		if key not in volumes:
+			frappe.throw(f"Unknown volume {key}; expected one of {', '.join(volumes)}")
+		volumes[key] = int(value)
+	return volumes
+
+
+def generate(company, scale="small", overrides=None, seed=42):
+	"""Fill the site with synthetic masters and transactions of `company`"""
+	volumes = get_volumes(scale, overrides)
+	generator = DataGenerator(company, volumes, seed)
+	generator.generate()
+	return volumes
+
+
+def clear():
+	"""Delete every generated row"""
+	for doctype in GENERATED_DOCTYPES:
+		column = "parent" if frappe.get_meta(doctype).istable else "name"
+		frappe.db.sql(f"delete from `tab{doctype}` where `{column}` like %s", (f"{PREFIX}%",))
+		frappe.db.commit()
+
+	for doctype in ("Item Group", "Customer Group", "Warehouse"):
+		rebuild_tree(doctype)
+	frappe.db.commit()
+
+
+class DataGenerator:
+	def __init__(self, company, volumes, seed):
+		self.company = company
+		self.volumes = volumes
+		self.random = random.Random(seed)
+		self.timestamp = now()
+		self.user = frappe.session.user
+		self.to_date = getdate(nowdate())
+		self.from_date = add_days(self.to_date, -365 * volumes["years"])
+		self.columns = {}
+
+	def generate(self):
+		self.customer_groups = self.make_tree(
+			"Customer Group", "parent_customer_group", "customer_group_name", "All Customer Groups",
+			self.volumes["customer_group_depth"], 3,
+		)
+		self.item_groups = self.make_tree(
+			"Item Group", "parent_item_group", "item_group_name", "All Item Groups",
+			self.volumes["item_group_depth"], self.volumes["item_group_fanout"],
+		)
+		self.make_warehouses()
+		self.make_customers()
+		self.make_items()
+
+		for doc_type in SALES_DOC_TYPES:
+			self.make_sales_documents(doc_type)
+
+		self.make_stock()
+		self.make_landed_cost_vouchers()
+
+	# ------------------------------------------------------------------
+	# MASTERS
+	# ------------------------------------------------------------------
+
+	def make_tree(self, doctype, parent_field, title_field, root, depth, fanout):
+		"""A tree `depth` levels deep under `root`; returns the leaf groups"""
+		level, rows = [root], []
+		for depth_index in range(depth):
+			next_level = []
+			for parent in level:
+				for _index in range(fanout):
+					name = f"{PREFIX}{doctype} {depth_index + 1}-{len(rows) + 1}"
+					is_group = int(depth_index < depth - 1)
+					rows.append({"name": name, title_field: name, parent_field: parent, "is_group": is_group})
+					next_level.append(name)
+			level = next_level
+
+		self.insert(doctype, rows)
+		rebuild_tree(doctype)
+		frappe.db.commit()
+		return level
+
+	def make_warehouses(self):
+		abbr = frappe.get_cached_value("Company", self.company, "abbr")
+		root = frappe.db.get_value("Warehouse", {"company": self.company, "is_group": 1}, "name")
+		self.warehouses = [f"{PREFIX}Stores {index} - {abbr}" for index in range(self.volumes["warehouses"])]
+		self.insert(
+			"Warehouse",
+			[
+				{"name": name, "warehouse_name": name, "company": self.company, "parent_warehouse": root}
+				for name in self.warehouses
+			],
+		)
+		rebuild_tree("Warehouse")
+		frappe.db.commit()
+
+	def make_customers(self):
+		territories = frappe.get_all("Territory", {"is_group": 0}, pluck="name") or [None]
+		sub_groups = [f"Sub Group {index}" for index in range(self.volumes["sub_groups"])]
+
+		self.customers = []
+		rows = []
+		for index in range(self.volumes["customers"]):
+			name = f"{PREFIX}CUST-{index:06d}"
+			row = {
+				"name": name,
+				"customer_name": f"Customer {index}",
+				"customer_group": self.random.choice(self.customer_groups),
+				"territory": self.random.choice(territories),
+				# a third of the customers have no sub group
+				"custom_sub_group": self.random.choice(sub_groups) if self.random.random() > 0.33 else None,
+			}
+			rows.append(row)
+			self.customers.append(row)
+
+		self.insert("Customer", rows)
+		frappe.db.commit()
+
+	def make_items(self):
+		self.items = []
+		rows = []
+		for index in range(self.volumes["items"]):
+			name = f"{PREFIX}ITEM-{index:06d}"
+			row = {
+				"name": name,
+				"item_code": name,
+				"item_name": f"Item {index}",
+				"item_group": self.random.choice(self.item_groups),
+				"stock_uom": "Nos",
+				"is_stock_item": 1,
+				"safety_stock": self.random.randint(0, 200),
+				"custom_item_type": self.random.choice(ITEM_TYPES),
+			}
+			rows.append(row)
+			self.items.append(row)
+
+		self.insert("Item", rows)
+		frappe.db.commit()
+
+	# ------------------------------------------------------------------
+	# TRANSACTIONS
+	# ------------------------------------------------------------------
+
+	def make_sales_documents(self, doc_type):
+		"""Headers with their lines; Sales Invoices get a third of the volume each of the other two"""
+		count = self.volumes["invoices"] if doc_type == "Sales Invoice" else self.volumes["invoices"] // 3
+		date_field = "transaction_date" if doc_type == "Sales Order" else "posting_date"
+		abbr = "".join(word[0] for word in doc_type.split())
+
+		for start in range(0, count, BATCH_SIZE):
+			headers, lines = [], []
+			for index in range(start, min(start + BATCH_SIZE, count)):
+				name = f"{PREFIX}{abbr}-{index:08d}"
+				customer = self.random.choice(self.customers)
+				posting_date = self.random_date()
+
+				total = total_qty = 0
+				for idx in range(1, self.random.randint(1, 2 * self.volumes["lines_per_invoice"]) + 1):
+					item = self.random.choice(self.items)
+					qty = self.random.randint(1, 50)
+					amount = round(qty * self.random.uniform(10, 1000), 2)
+					total += amount
+					total_qty += qty
+					lines.append(
+						{
+							"name": f"{name}-{idx}",
+							"parent": name,
+							"parenttype": doc_type,
+							"parentfield": "items",
+							"idx": idx,
+							"docstatus": 1,
+							"item_code": item["name"],
+							"item_name": item["item_name"],
+							"item_group": item["item_group"],
+							"stock_uom": item["stock_uom"],
+							"uom": item["stock_uom"],
+							"qty": qty,
+							"stock_qty": qty,
+							"conversion_factor": 1,
+							"rate": round(amount / qty, 2),
+							"amount": amount,
+							"net_amount": amount,
+							"base_amount": amount,
+							"base_net_amount": amount,
+						}
+					)
+
+				header = {
+					"name": name,
+					"docstatus": 1,
+					"company": self.company,
+					"customer": customer["name"],
+					"customer_name": customer["customer_name"],
+					"territory": customer["territory"],
+					date_field: posting_date,
+					"total_qty": total_qty,
+					"net_total": total,
+					"base_net_total": total,
+					"grand_total": total,
+					"base_grand_total": total,
+				}
+				if doc_type == "Sales Invoice":
+					header.update(
+						{
+							"is_opening": "No",
+							"due_date": add_days(posting_date, 30),
+							# most older invoices are paid
+							"outstanding_amount": total if self.random.random() < 0.2 else 0,
+						}
+					)
+				elif doc_type == "Sales Order":
+					header["order_type"] = self.random.choice(ORDER_TYPES)
+				headers.append(header)
+
+			self.insert(doc_type, headers)
+			self.insert(f"{doc_type} Item", lines)
+			frappe.db.commit()
+
+	def make_stock(self):
+		bins = [
+			{
+				"name": f"{PREFIX}BIN-{index:08d}",
+				"item_code": item["name"],
+				"warehouse": warehouse,
+				"actual_qty": self.random.randint(0, 500),
+			}
+			for index, (item, warehouse) in enumerate(
+				(item, warehouse)
+				for item in self.items
+				for warehouse in self.random.sample(self.warehouses, min(3, len(self.warehouses)))
+			)
+		]
+		self.insert("Bin", bins)
+		frappe.db.commit()
+
+		count = self.volumes["stock_ledger_entries"]
+		for start in range(0, count, BATCH_SIZE):
+			rows = []
+			for index in range(start, min(start + BATCH_SIZE, count)):
+				item = self.random.choice(self.items)
+				incoming = self.random.random() < 0.5
+				rows.append(
+					{
+						"name": f"{PREFIX}SLE-{index:09d}",
+						"docstatus": 1,
+						"is_cancelled": 0,
+						"company": self.company,
+						"item_code": item["name"],
+						"warehouse": self.random.choice(self.warehouses),
+						"posting_date": self.random_date(),
+						"posting_time": f"{self.random.randint(8, 19):02d}:{self.random.randint(0, 59):02d}",
+						"voucher_type": "Stock Entry",
+						"voucher_no": f"{PREFIX}STE-{index:09d}",
+						"actual_qty": self.random.randint(1, 100) * (1 if incoming else -1),
+						"incoming_rate": round(self.random.uniform(5, 800), 2) if incoming else 0,
+					}
+				)
+			self.insert("Stock Ledger Entry", rows)
+			frappe.db.commit()
+
+	def make_landed_cost_vouchers(self):
+		count = self.volumes["landed_cost_vouchers"]
+		for start in range(0, count, BATCH_SIZE):
+			vouchers, items = [], []
+			for index in range(start, min(start + BATCH_SIZE, count)):
+				name = f"{PREFIX}LCV-{index:08d}"
+				vouchers.append(
+					{
+						"name": name,
+						"docstatus": 1,
+						"company": self.company,
+						"posting_date": self.random_date(),
+					}
+				)
+				for idx, item in enumerate(self.random.sample(self.items, min(5, len(self.items))), 1):
+					items.append(
+						{
+							"name": f"{name}-{idx}",
+							"parent": name,
+							"parenttype": "Landed Cost Voucher",
+							"parentfield": "items",
+							"idx": idx,
+							"docstatus": 1,
+							"item_code": item["name"],
+							"applicable_charges": round(self.random.uniform(1, 200), 2),
+						}
+					)
+			self.insert("Landed Cost Voucher", vouchers)
+			self.insert("Landed Cost Item", items)
+			frappe.db.commit()
+
+	def random_date(self):
+		return add_days(self.from_date, self.random.randint(0, (self.to_date - self.from_date).days))
+
+	# ------------------------------------------------------------------
+	# WRITING
+	# ------------------------------------------------------------------
+
+	def insert(self, doctype, rows):
+		"""Bulk insert `rows`, leaving out fields the site's table does not have (e.g. custom fields)"""
+		if not rows:
+			return
+
+		if doctype not in self.columns:
+			self.columns[doctype] = set(frappe.db.get_table_columns(doctype))
+		fields = [field for field in rows[0] if field in self.columns[doctype]]
+
+		frappe.db.bulk_insert(
+			doctype,
+			["creation", "modified", "owner", "modified_by", *fields],
+			[
+				[self.timestamp, self.timestamp, self.user, self.user, *[row[field] for field in fields]]
+				for row in rows
+			],
+		)
@@ -0,0 +1,93 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+"""
+EXPLAIN check of the report queries.
+
+Runs the benchmark scenarios once each, keeps every SELECT they send and
+EXPLAINs it. A table read in full (access type ALL) over more than
+MIN_SCAN_ROWS estimated rows means an index is missing or not usable for
+that query. See patches/v1_0/add_report_indexes.py for the indexes.
+"""
+
+import re
+from contextlib import contextmanager
+
+import frappe
+
+from customvinodreports.benchmarks.runner import get_scenarios
+
+# the optimizer scans small tables in full whatever their indexes
+MIN_SCAN_ROWS = 1000
+
+# report -> table aliases it reads in full by design
+EXPECTED_FULL_SCANS = {
+	# both list every item
+	"Item Last Cost": {"i"},
+	"Item Rate": {"i"},
+}
+
+SELECT_PATTERN = re.compile(r"^\s*(\(\s*)?(select|with)\b", re.IGNORECASE)
+WHERE_PATTERN = re.compile(r"\bwhere\b", re.IGNORECASE)
+
+
+def check_query_plans(company, quick=True, match=None):
+	"""[(scenario, table, estimated rows, query)] of the full table scans in the report queries"""
+	if frappe.db.db_type != "mariadb":
+		frappe.throw("The query plan check reads MariaDB's EXPLAIN output")
+
+	scans, explained = [], set()
+	for name, report_name, run, filters in get_scenarios(company, quick):
+		if match and match.lower() not in name.lower():
+			continue
+
+		with capture_queries() as queries:
+			run(dict(filters))
+
+		for query, values in queries:
+			if query in explained:
+				continue
+			explained.add(query)
+
+			for table, rows in get_full_table_scans(query, values):
+				if table not in EXPECTED_FULL_SCANS.get(report_name, ()):
+					scans.append((name, table, rows, query))
+	return scans
+
+
+def get_full_table_scans(query, values):
+	"""(table, estimated rows) of the tables EXPLAIN reads in full"""
+	# a query without any condition asks for the whole table, e.g. loading a tree
+	if not WHERE_PATTERN.search(query):
+		return []
+
+	plan = frappe.db.sql(f"explain {query}", values, as_dict=True)
+	return [
+		(step.table, step.rows)
+		for step in plan
+		if step.type == "ALL" and (step.rows or 0) > MIN_SCAN_ROWS
+		# derived and temporary tables are the query's own intermediate results
+		and not (step.table or "").startswith("<")
+	]
+
+
+@contextmanager
+def capture_queries():
+	"""Collect (query, values) of the SELECTs sent through `frappe.db.sql` in the block"""
+	queries = []
+	patched_sql = "sql" in vars(frappe.db)
+	sql = frappe.db.sql
+
+	def capturing_sql(query, values=(), *args, **kwargs):
+		if SELECT_PATTERN.match(str(query)):
+			queries.append((str(query), values))
+		return sql(query, values, *args, **kwargs)
+
+	frappe.db.sql = capturing_sql
+	try:
+		yield queries
+	finally:
+		if patched_sql:
+			frappe.db.sql = sql
+		else:
+			del frappe.db.sql
@@ -0,0 +1,225 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+"""
+Report benchmarks.
+
+Every scenario runs one report with fixed filters `repeat` times and keeps the
+median wall time, the queries and rows fetched, and the Python heap peak of a
+separate traced run. Results are compared with a baseline recorded on the
+same machine; a scenario more than `tolerance` slower or heavier than its
+baseline is a regression.
+"""
+
+import itertools
+import json
+import os
+import statistics
+import tracemalloc
+
+import frappe
+from frappe.utils import add_days, add_months, getdate, nowdate
+
+from customvinodreports.benchmarks.data import PREFIX
+from customvinodreports.vinodreports.doctype.report_performance_sample.report_performance_sample import (
+	profile_report,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+# differences below these are noise on any machine, whatever the tolerance says
+MIN_REGRESSION_SECONDS = 0.05
+MIN_REGRESSION_MB = 5
+
+ANALYTICS_DIMENSIONS = {
+	"tree_type": ("Customer Group", "Customer", "Item Group", "Item", "Territory", "Order Type", "Project"),
+	"doc_type": ("Sales Invoice", "Delivery Note", "Sales Order"),
+	"range": ("Monthly", "Weekly", "Quarterly", "Yearly"),
+	"value_quantity": ("Value", "Quantity", "Value and Quantity"),
+	"compare_with_previous_year": (0, 1),
+	"use_fact_table": (0, 1),
+}
+# --quick keeps every value of these and only the first of the others
+QUICK_DIMENSIONS = ("tree_type", "compare_with_previous_year", "use_fact_table")
+
+
+def get_scenarios(company, quick=False):
+	"""(name, report_name, run, filters) of every scenario; `run(filters)` runs the report once"""
+	from customvinodreports.vinodreports.report.custom_most_selling_item_report_which_are_out_of_stock import (
+		custom_most_selling_item_report_which_are_out_of_stock as out_of_stock,
+	)
+	from customvinodreports.vinodreports.report.custom_outstanding_debtors_month_wise import (
+		custom_outstanding_debtors_month_wise as outstanding_debtors,
+	)
+	from customvinodreports.vinodreports.report.item_last_cost import item_last_cost
+	from customvinodreports.vinodreports.report.item_rate import item_rate
+	from customvinodreports.vinodreports.report.sales_person_custom_report import sales_person_custom_report
+
+	# 52 whole weeks ending last Sunday: Weekly gets every day into its 52 periods, and the
+	# previous year (52 weeks back for Weekly, a calendar year otherwise) does not overlap it
+	today = getdate(nowdate())
+	to_date = add_days(today, -((today.weekday() + 1) % 7))
+	from_date = add_days(to_date, -363)
+	scenarios = []
+
+	dimensions = {
+		key: values[:1] if quick and key not in QUICK_DIMENSIONS else values
+		for key, values in ANALYTICS_DIMENSIONS.items()
+	}
+	for values in itertools.product(*dimensions.values()):
+		filters = dict(zip(dimensions, values, strict=True))
+		if filters["tree_type"] == "Order Type" and filters["doc_type"] != "Sales Order":
+			# the report returns nothing without a Sales Order
+			continue
+		name = "Sales Analytics: " + ", ".join(
+			f"{key}={value}" if key in ("compare_with_previous_year", "use_fact_table") else str(value)
+			for key, value in filters.items()
+		)
+		filters.update({"company": company, "from_date": from_date, "to_date": to_date, "skip_cache": 1})
+		scenarios.append((name, "Custom Sales Analytic Report", run_sales_analytics, filters))
+
+	out_of_stock_filters = {
+		"all time": {},
+		"last month": {"from_date": add_months(to_date, -1), "to_date": to_date},
+		"last year": {"from_date": from_date, "to_date": to_date},
+	}
+	item_group = frappe.db.get_value("Item Group", {"name": ("like", f"{PREFIX}%"), "is_group": 0})
+	if item_group:
+		out_of_stock_filters["one item group"] = {"item_group": item_group}
+	for label, filters in out_of_stock_filters.items():
+		scenarios.append(
+			(
+				f"Out of Stock: {label}",
+				"Custom Most selling item report which are out of stock",
+				out_of_stock.execute,
+				{"custom_item_type": "Finished Goods", **filters},
+			)
+		)
+
+	scenarios.append(
+		("Outstanding Debtors: summary", "Custom Outstanding Debtors Month-wise", outstanding_debtors.execute, {})
+	)
+	for months in (0, 6, 12):
+		due_month = add_months(to_date, -months).strftime("%Y-%m")
+		scenarios.append(
+			(
+				f"Outstanding Debtors: {due_month}",
+				"Custom Outstanding Debtors Month-wise",
+				outstanding_debtors.execute,
+				{"due_month": due_month},
+			)
+		)
+
+	scenarios.extend(
+		[
+			("Item Last Cost", "Item Last Cost", item_last_cost.execute, {}),
+			("Item Rate", "Item Rate", item_rate.execute, {}),
+			("Sales Person", "Sales Person Custom Report", sales_person_custom_report.execute, {}),
+		]
+	)
+	return scenarios
+
+
+def run_sales_analytics(filters):
+	from customvinodreports.vinodreports.report.custom_sales_analytic_report.custom_sales_analytic_report import (
+		Analytics,
+	)
+
+	# no time budget: a benchmark measures the whole run, not the part that fits a request
+	return Analytics(filters).run(time_budget=0)
+
+
+def run_benchmarks(company, repeat=DEFAULT_REPEAT, quick=False, match=None, on_result=None):
+	results = []
+	for name, report_name, run, filters in get_scenarios(company, quick):
+		if match and match.lower() not in name.lower():
+			continue
+
+		result = measure(name, report_name, run, filters, repeat)
+		results.append(result)
+		if on_result:
+			on_result(result)
+	return results
+
+
+def measure(name, report_name, run, filters, repeat):
+	durations = []
+	for _ in range(repeat):
+		with profile_report(report_name) as profile:
+			run(dict(filters))
+		durations.append(profile.duration)
+
+	# memory is traced in a run of its own, tracemalloc slows down the runs it watches
+	tracemalloc.start()
+	try:
+		run(dict(filters))
+		peak_memory = tracemalloc.get_traced_memory()[1]
+	finally:
+		tracemalloc.stop()
+
+	seconds = statistics.median(durations)
+	return {
+		"scenario": name,
+		"seconds": round(seconds, 4),
+		"queries": profile.query_count,
+		"rows_fetched": profile.rows_fetched,
+		"rows_per_second": round(profile.rows_fetched / seconds) if seconds else 0,
+		"peak_memory_mb": round(peak_memory / (1024 * 1024), 1),
+	}
+
+
+# ------------------------------------------------------------------
+# BASELINE
+# ------------------------------------------------------------------
+
+
+def load_baseline(path=BASELINE_PATH):
+	if not os.path.exists(path):
+		return {}
+
+	with open(path) as f:
+		return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+	"""Merge `results` into the baseline; scenarios that were not run keep their figures"""
+	baseline = load_baseline(path)
+	for result in results:
+		baseline[result["scenario"]] = {
+			"seconds": result["seconds"],
+			"peak_memory_mb": result["peak_memory_mb"],
+		}
+
+	with open(path, "w") as f:
+		json.dump(baseline, f, indent=1, sort_keys=True)
+		f.write("\n")
+
+
+def get_regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+	"""Results slower or heavier than their baseline by more than `tolerance`, with the reason"""
+	regressions = []
+	for result in results:
+		expected = baseline.get(result["scenario"])
+		if not expected:
+			continue
+
+		reasons = []
+		slower = result["seconds"] - expected["seconds"]
+		if slower > max(expected["seconds"] * tolerance, MIN_REGRESSION_SECONDS):
+			reasons.append(f"{result['seconds']:.3f}s against {expected['seconds']:.3f}s")
+
+		heavier = result["peak_memory_mb"] - expected["peak_memory_mb"]
+		if heavier > max(expected["peak_memory_mb"] * tolerance, MIN_REGRESSION_MB):
+			reasons.append(f"{result['peak_memory_mb']:.1f} MB against {expected['peak_memory_mb']:.1f} MB")
+
+		if reasons:
+			regressions.append((result["scenario"], "; ".join(reasons)))
+	return regressions
+
+
+def format_result(result):
+	return (
+		f"{result['seconds']:>9.3f}s {result['queries']:>6} queries {result['rows_fetched']:>10} rows "
+		f"{result['rows_per_second']:>10} rows/s {result['peak_memory_mb']:>8.1f} MB  {result['scenario']}"
+	)
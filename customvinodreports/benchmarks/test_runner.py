@@ -0,0 +1,76 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+import unittest
+
+import frappe
+from frappe.utils import getdate
+
+from customvinodreports.benchmarks.runner import (
+	MIN_REGRESSION_MB,
+	MIN_REGRESSION_SECONDS,
+	get_regressions,
+	get_scenarios,
+)
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.custom_sales_analytic_report import (
+	Analytics,
+)
+
+BASELINE = {"Item Rate": {"seconds": 2.0, "peak_memory_mb": 100.0}}
+
+
+def get_result(seconds=2.0, peak_memory_mb=100.0, scenario="Item Rate"):
+	return {"scenario": scenario, "seconds": seconds, "peak_memory_mb": peak_memory_mb}
+
+
+class TestGetRegressions(unittest.TestCase):
+	def test_new_scenario(self):
+		# a scenario without a baseline has nothing to regress from
+		self.assertEqual(get_regressions([get_result(100.0, 1000.0, scenario="Item Last Cost")], BASELINE), [])
+
+	def test_within_tolerance(self):
+		self.assertEqual(get_regressions([get_result(2.4, 120.0)], BASELINE, tolerance=0.25), [])
+
+	def test_slower(self):
+		regressions = get_regressions([get_result(2.6)], BASELINE, tolerance=0.25)
+
+		self.assertEqual(regressions, [("Item Rate", "2.600s against 2.000s")])
+
+	def test_heavier(self):
+		regressions = get_regressions([get_result(peak_memory_mb=130.0)], BASELINE, tolerance=0.25)
+
+		self.assertEqual(regressions, [("Item Rate", "130.0 MB against 100.0 MB")])
+
+	def test_slower_and_heavier(self):
+		regressions = get_regressions([get_result(3.0, 200.0)], BASELINE, tolerance=0.25)
+
+		self.assertEqual(regressions, [("Item Rate", "3.000s against 2.000s; 200.0 MB against 100.0 MB")])
+
+	def test_below_noise_floor(self):
+		# twice as slow and heavy, but by less than the absolute minimums
+		baseline = {"Item Rate": {"seconds": 0.01, "peak_memory_mb": 1.0}}
+		result = get_result(0.01 + MIN_REGRESSION_SECONDS / 2, 1.0 + MIN_REGRESSION_MB / 2)
+
+		self.assertEqual(get_regressions([result], baseline, tolerance=0.25), [])
+
+
+class TestScenarios(unittest.TestCase):
+	def test_sales_analytics_date_ranges(self):
+		for name, report_name, _run, filters in get_scenarios("_Test Company"):
+			if report_name != "Custom Sales Analytic Report":
+				continue
+
+			with self.subTest(name):
+				analytics = Analytics.__new__(Analytics)
+				analytics.filters = frappe._dict(filters)
+				from_date, to_date = getdate(filters["from_date"]), getdate(filters["to_date"])
+
+				if filters["compare_with_previous_year"]:
+					# else get_prior_date_ranges refuses the range
+					self.assertLess(analytics.get_prior_date(to_date), from_date)
+
+				# Yearly periods follow the site's fiscal years, at most two of them here
+				if filters["range"] != "Yearly":
+					# the periods reach the end of the range, no row falls past them
+					analytics.get_period_date_ranges()
+					self.assertEqual(analytics.periodic_daterange[-1], to_date)
@@ -0,0 +1,193 @@
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("rebuild-sales-analytics-facts")
+@click.option(
+	"--doctype", "doc_types", multiple=True, help="Sales Invoice, Delivery Note or Sales Order (repeatable)"
+)
+@click.option("--from-date", help="Only rebuild facts dated on or after this date")
+@click.option("--to-date", help="Only rebuild facts dated on or before this date")
+@pass_context
+def rebuild_sales_analytics_facts(context, doc_types=None, from_date=None, to_date=None):
+	"Backfill the Sales Analytics Fact table from submitted sales documents"
+	import frappe
+
+	from customvinodreports.vinodreports.doctype.sales_analytics_fact.sales_analytics_fact import (
+		rebuild_sales_analytics_facts,
+	)
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		rebuild_sales_analytics_facts(doc_types or None, from_date, to_date)
+	finally:
+		frappe.destroy()
+
+
+def connect_site(context):
+	import frappe
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+
+
+def get_company(company=None):
+	import frappe
+
+	company = company or frappe.defaults.get_global_default("company")
+	if not company:
+		frappe.throw("Pass --company; the site has no default company")
+	return company
+
+
+@click.command("generate-benchmark-data")
+@click.option("--company", help="Company of the generated documents (default: the site's default company)")
+@click.option(
+	"--scale", type=click.Choice(["small", "medium", "large"]), default="small", help="Preset volumes"
+)
+@click.option(
+	"--volume", "volumes", multiple=True, help="Override one preset volume, e.g. invoices=50000 (repeatable)"
+)
+@click.option("--seed", type=int, default=42, help="Random seed; the same seed generates the same data")
+@pass_context
+def generate_benchmark_data(context, company=None, scale="small", volumes=None, seed=42):
+	"Fill a disposable benchmark site with synthetic customers, items, sales and stock"
+	import frappe
+
+	from customvinodreports.benchmarks.data import clear, generate
+	from customvinodreports.vinodreports.doctype.sales_analytics_fact.sales_analytics_fact import (
+		rebuild_sales_analytics_facts,
+	)
+
+	connect_site(context)
+	try:
+		if not frappe.conf.get("allow_report_benchmark_data"):
+			frappe.throw(
+				"Benchmark data is written around the controllers and is only meant for a disposable site. "
+				f"Run `bench --site {frappe.local.site} set-config allow_report_benchmark_data 1` if this is one."
+			)
+
+		overrides = dict(volume.split("=", 1) for volume in volumes or ())
+		clear()
+		generated = generate(get_company(company), scale, overrides, seed)
+		click.echo(", ".join(f"{key}={value}" for key, value in generated.items()))
+
+		click.echo("Rebuilding the sales analytics facts")
+		rebuild_sales_analytics_facts()
+	finally:
+		frappe.destroy()
+
+
+@click.command("clear-benchmark-data")
+@pass_context
+def clear_benchmark_data(context):
+	"Delete the data made by generate-benchmark-data"
+	import frappe
+
+	from customvinodreports.benchmarks.data import clear
+	from customvinodreports.vinodreports.doctype.sales_analytics_fact.sales_analytics_fact import (
+		rebuild_sales_analytics_facts,
+	)
+
+	connect_site(context)
+	try:
+		clear()
+		rebuild_sales_analytics_facts()
+	finally:
+		frappe.destroy()
+
+
+@click.command("run-report-benchmarks")
+@click.option("--company", help="Company to run the reports for (default: the site's default company)")
+@click.option("--repeat", type=int, default=3, help="Runs per scenario; the median is kept")
+@click.option(
+	"--quick", is_flag=True, help="Only vary the tree type, comparison and fact table of Sales Analytics"
+)
+@click.option("--match", help="Only run scenarios whose name contains this text")
+@click.option("--baseline", help="Baseline file (default: benchmarks/baseline.json in this app)")
+@click.option(
+	"--tolerance", type=float, default=0.25, help="Allowed slowdown or memory growth, e.g. 0.25 = 25%"
+)
+@click.option("--update-baseline", is_flag=True, help="Record these results as the new baseline")
+@pass_context
+def run_report_benchmarks(
+	context,
+	company=None,
+	repeat=3,
+	quick=False,
+	match=None,
+	baseline=None,
+	tolerance=0.25,
+	update_baseline=False,
+):
+	"Time every report across filter permutations and fail on regressions against the baseline"
+	import frappe
+
+	from customvinodreports.benchmarks.runner import (
+		BASELINE_PATH,
+		format_result,
+		get_regressions,
+		load_baseline,
+		run_benchmarks,
+		save_baseline,
+	)
+
+	baseline_path = baseline or BASELINE_PATH
+	connect_site(context)
+	try:
+		results = run_benchmarks(
+			get_company(company),
+			repeat=repeat,
+			quick=quick,
+			match=match,
+			on_result=lambda result: click.echo(format_result(result)),
+		)
+	finally:
+		frappe.destroy()
+
+	if update_baseline:
+		save_baseline(results, baseline_path)
+		click.echo(f"Baseline written to {baseline_path}")
+		return
+
+	regressions = get_regressions(results, load_baseline(baseline_path), tolerance)
+	for scenario, reason in regressions:
+		click.secho(f"Regression in {scenario}: {reason}", fg="red")
+	if regressions:
+		raise SystemExit(1)
+
+
+@click.command("check-report-query-plans")
+@click.option("--company", help="Company to run the reports for (default: the site's default company)")
+@click.option("--all", "all_scenarios", is_flag=True, help="Every Sales Analytics permutation, not just --quick")
+@click.option("--match", help="Only check scenarios whose name contains this text")
+@pass_context
+def check_report_query_plans(context, company=None, all_scenarios=False, match=None):
+	"EXPLAIN every report query and fail if one reads a large table in full"
+	import frappe
+
+	from customvinodreports.benchmarks.query_plans import check_query_plans
+
+	connect_site(context)
+	try:
+		scans = check_query_plans(get_company(company), quick=not all_scenarios, match=match)
+	finally:
+		frappe.destroy()
+
+	for scenario, table, rows, query in scans:
+		click.secho(f"Full scan of {table} (~{rows} rows) in {scenario}:", fg="red")
+		click.echo(query.strip())
+	if scans:
+		raise SystemExit(1)
+	click.echo("No full table scans")
+
+
+commands = [
+	rebuild_sales_analytics_facts,
+	generate_benchmark_data,
+	clear_benchmark_data,
+	run_report_benchmarks,
+	check_report_query_plans,
+]
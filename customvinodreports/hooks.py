@@ -86,7 +86,7 @@ app_include_css = "/apps/customvinodreports/customvinodreports/public/css/custom
 # ------------
 
 # before_install = "customvinodreports.install.before_install"
-# after_install = "customvinodreports.install.after_install"
+after_install = "customvinodreports.install.after_install"
 
 # Uninstallation
 # ------------
@@ -148,6 +148,46 @@ app_include_css = "/apps/customvinodreports/customvinodreports/public/css/custom
 # 	}
 # }
 
+_sales_analytics_fact = (
+	"customvinodreports.vinodreports.doctype.sales_analytics_fact.sales_analytics_fact.enqueue_fact_refresh"
+)
+_sales_analytics_cache = "customvinodreports.vinodreports.report.custom_sales_analytic_report.result_cache.invalidate_for_document"
+_sales_analytics_changes = (
+	"customvinodreports.vinodreports.report.custom_sales_analytic_report.delta_refresh.record_document_change"
+)
+_sales_analytics_tree = "customvinodreports.vinodreports.report.custom_sales_analytic_report.tree_cache"
+_tree_cache_events = {
+	"on_update": f"{_sales_analytics_tree}.invalidate_tree_cache",
+	"on_trash": f"{_sales_analytics_tree}.invalidate_tree_cache",
+	"after_rename": f"{_sales_analytics_tree}.invalidate_tree_cache",
+}
+
+doc_events = {
+	"Sales Invoice": {
+		"on_submit": [_sales_analytics_fact, _sales_analytics_cache, _sales_analytics_changes],
+		"on_cancel": [_sales_analytics_fact, _sales_analytics_cache, _sales_analytics_changes],
+	},
+	"Delivery Note": {
+		"on_submit": [_sales_analytics_fact, _sales_analytics_cache, _sales_analytics_changes],
+		"on_cancel": [_sales_analytics_fact, _sales_analytics_cache, _sales_analytics_changes],
+	},
+	"Sales Order": {
+		"on_submit": [
+			_sales_analytics_fact,
+			_sales_analytics_cache,
+			_sales_analytics_changes,
+			f"{_sales_analytics_tree}.update_known_order_types",
+		],
+		"on_cancel": [_sales_analytics_fact, _sales_analytics_cache, _sales_analytics_changes],
+		"on_update_after_submit": [_sales_analytics_fact, _sales_analytics_cache, _sales_analytics_changes],
+	},
+	"Customer Group": _tree_cache_events,
+	"Item Group": _tree_cache_events,
+	"Territory": _tree_cache_events,
+	"Supplier Group": _tree_cache_events,
+	"Company": _tree_cache_events,
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -169,6 +209,12 @@ app_include_css = "/apps/customvinodreports/customvinodreports/public/css/custom
 # 	],
 # }
 
+scheduler_events = {
+	"hourly": [
+		"customvinodreports.vinodreports.doctype.report_performance_sample.report_performance_sample.flush_report_performance_samples"
+	],
+}
+
 # Testing
 # -------
 
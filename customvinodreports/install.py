@@ -0,0 +1,6 @@
+from customvinodreports.patches.v1_0 import add_report_indexes
+
+
+def after_install():
+	# patches are marked as done on a fresh install without running
+	add_report_indexes.execute()
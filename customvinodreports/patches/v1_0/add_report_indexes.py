@@ -0,0 +1,35 @@
+import frappe
+
+# (doctype, columns, index name) of the composite indexes the report queries filter and sort on;
+# stock ERPNext only indexes most of these columns one at a time
+REPORT_INDEXES = (
+	# Sales Analytics header scans: docstatus / company / date range
+	("Sales Invoice", ["docstatus", "company", "posting_date"], None),
+	("Delivery Note", ["docstatus", "company", "posting_date"], None),
+	("Sales Order", ["docstatus", "company", "transaction_date"], None),
+	# Outstanding Debtors: unpaid invoices by due month
+	("Sales Invoice", ["docstatus", "outstanding_amount", "due_date"], None),
+	# line items joined to their headers, then grouped or filtered by item
+	("Sales Invoice Item", ["parent", "item_code"], None),
+	("Delivery Note Item", ["parent", "item_code"], None),
+	("Sales Order Item", ["parent", "item_code"], None),
+	# Item Last Cost / Item Rate: latest incoming entry of an item. The sort columns follow
+	# item_code so the newest entry is read first; incoming_rate is filtered from the index
+	(
+		"Stock Ledger Entry",
+		["item_code", "posting_date", "posting_time", "creation", "incoming_rate"],
+		"item_code_posting_incoming_rate_index",
+	),
+	("Landed Cost Item", ["item_code", "parent"], None),
+	("Landed Cost Voucher", ["docstatus", "posting_date"], None),
+	# Out of Stock: custom item type filter, where the custom field exists
+	("Item", ["custom_item_type", "item_group"], None),
+)
+
+
+def execute():
+	for doctype, columns, index_name in REPORT_INDEXES:
+		if not all(frappe.db.has_column(doctype, column) for column in columns):
+			continue
+
+		frappe.db.add_index(doctype, columns, index_name)
@@ -0,0 +1,228 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+import functools
+import json
+import resource
+import sys
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, cint, now, now_datetime
+
+SAMPLE_DOCTYPE = "Report Performance Sample"
+# samples are queued in Redis by the request and written by the hourly flush
+SAMPLE_QUEUE_KEY = "report_performance_samples"
+MAX_QUEUED_SAMPLES = 10000
+RETENTION_DAYS = 90
+
+# ru_maxrss is in KiB on Linux and in bytes on macOS
+MAXRSS_PER_MB = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+
+class ReportPerformanceSample(Document):
+	pass
+
+
+class ReportProfile:
+	"""
+	Wall time, query count and rows of one report execute, in total and per
+	phase, the change in resident memory over it and the worker's memory peak.
+	Queries are counted by wrapping `frappe.db.sql` for the duration of the execute.
+	"""
+
+	def __init__(self, report_name):
+		self.report_name = report_name
+		self.phases = {}
+		self.open_phases = []
+		self.query_count = 0
+		self.rows_fetched = 0
+
+	def start(self):
+		self.started_at = now_datetime()
+		self.start_time = time.perf_counter()
+		self.start_rss = get_rss_mb()
+
+		self.patched_sql = "sql" in vars(frappe.db)
+		self.sql = frappe.db.sql
+		frappe.db.sql = self.counted_sql
+
+	def stop(self):
+		if self.patched_sql:
+			frappe.db.sql = self.sql
+		else:
+			del frappe.db.sql
+
+		self.duration = time.perf_counter() - self.start_time
+		# ru_maxrss is the peak of the whole worker since it started, not of this execute
+		self.process_peak_memory_mb = get_maxrss_mb()
+		end_rss = get_rss_mb()
+		self.memory_change_mb = None if end_rss is None else end_rss - self.start_rss
+
+	def counted_sql(self, *args, **kwargs):
+		self.query_count += 1
+		result = self.sql(*args, **kwargs)
+		if isinstance(result, list | tuple):
+			self.rows_fetched += len(result)
+		elif kwargs.get("as_iterator"):
+			result = self.count_rows(result)
+		return result
+
+	def count_rows(self, rows):
+		for row in rows:
+			self.rows_fetched += 1
+			yield row
+
+	@contextmanager
+	def phase(self, name):
+		"""Time the block as `name`; nested phases are named "outer / inner" """
+		self.open_phases.append(name)
+		key = " / ".join(self.open_phases)
+		start, queries, rows = time.perf_counter(), self.query_count, self.rows_fetched
+		try:
+			yield
+		finally:
+			self.open_phases.pop()
+			phase = self.phases.setdefault(key, {"seconds": 0.0, "queries": 0, "rows": 0})
+			phase["seconds"] += time.perf_counter() - start
+			phase["queries"] += self.query_count - queries
+			phase["rows"] += self.rows_fetched - rows
+
+	def get_summary(self):
+		return {
+			"report": self.report_name,
+			"duration": round(self.duration, 4),
+			"query_count": self.query_count,
+			"rows_fetched": self.rows_fetched,
+			"process_peak_memory_mb": round(self.process_peak_memory_mb, 1),
+			"memory_change_mb": None if self.memory_change_mb is None else round(self.memory_change_mb, 1),
+			"phases": {
+				name: {**phase, "seconds": round(phase["seconds"], 4)} for name, phase in self.phases.items()
+			},
+		}
+
+
+def get_maxrss_mb():
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / MAXRSS_PER_MB
+
+
+def get_rss_mb():
+	"""Current resident memory of the process, or None without /proc (e.g. on macOS)"""
+	try:
+		with open("/proc/self/statm") as f:
+			pages = int(f.read().split()[1])
+	except OSError:
+		return None
+	return pages * resource.getpagesize() / (1024 * 1024)
+
+
+# ------------------------------------------------------------------
+# INSTRUMENTATION
+# ------------------------------------------------------------------
+
+
+def instrument_report(report_name):
+	"""
+	Decorator for a report's `execute`. Records a ReportProfile, attaches its
+	summary to the response as `report_profile` and queues it as a sample.
+	A nested execute (e.g. one report calling another) is part of the outer one.
+	"""
+
+	def decorator(execute):
+		@functools.wraps(execute)
+		def wrapper(filters=None, *args, **kwargs):
+			if getattr(frappe.local, "report_profile", None) or not is_enabled():
+				return execute(filters, *args, **kwargs)
+
+			try:
+				with profile_report(report_name) as profile:
+					return execute(filters, *args, **kwargs)
+			finally:
+				summary = profile.get_summary()
+				if getattr(frappe.local, "response", None) is not None:
+					frappe.local.response["report_profile"] = summary
+				queue_sample(profile, summary, filters)
+
+		return wrapper
+
+	return decorator
+
+
+@contextmanager
+def profile_report(report_name):
+	"""Profile the block as the running report; phases inside it are recorded on the profile"""
+	profile = ReportProfile(report_name)
+	frappe.local.report_profile = profile
+	profile.start()
+	try:
+		yield profile
+	finally:
+		profile.stop()
+		frappe.local.report_profile = None
+
+
+@contextmanager
+def report_phase(name):
+	"""Time a phase of the running report; does nothing outside an instrumented execute"""
+	profile = getattr(frappe.local, "report_profile", None)
+	if not profile:
+		yield
+		return
+
+	with profile.phase(name):
+		yield
+
+
+def is_enabled():
+	# on by default; `bench set-config report_profiling 0` turns it off
+	return cint(frappe.conf.get("report_profiling", 1))
+
+
+# ------------------------------------------------------------------
+# SAMPLES
+# ------------------------------------------------------------------
+
+
+def queue_sample(profile, summary, filters):
+	sample = {
+		"report_name": profile.report_name,
+		"started_at": str(profile.started_at),
+		"user": frappe.session.user,
+		"duration": summary["duration"],
+		"query_count": summary["query_count"],
+		"rows_fetched": summary["rows_fetched"],
+		"process_peak_memory_mb": summary["process_peak_memory_mb"],
+		"memory_change_mb": summary["memory_change_mb"],
+		"phases": json.dumps(summary["phases"], indent=1),
+		"filters": json.dumps(filters or {}, indent=1, default=str),
+	}
+	try:
+		frappe.cache.rpush(SAMPLE_QUEUE_KEY, json.dumps(sample))
+		frappe.cache.ltrim(SAMPLE_QUEUE_KEY, -MAX_QUEUED_SAMPLES, -1)
+	except Exception:
+		# losing a sample must never fail the report
+		frappe.log_error("Could not queue report performance sample")
+
+
+def flush_report_performance_samples():
+	"""Hourly: write the queued samples and drop the ones past the retention period"""
+	samples = []
+	while raw := frappe.cache.lpop(SAMPLE_QUEUE_KEY):
+		samples.append(json.loads(raw))
+
+	if samples:
+		fields = list(samples[0])
+		timestamp, user = now(), frappe.session.user
+		frappe.db.bulk_insert(
+			SAMPLE_DOCTYPE,
+			["name", "creation", "modified", "owner", "modified_by", *fields],
+			[
+				[frappe.generate_hash(), timestamp, timestamp, user, user, *[sample[field] for field in fields]]
+				for sample in samples
+			],
+		)
+
+	frappe.db.delete(SAMPLE_DOCTYPE, {"creation": ("<", add_days(now(), -RETENTION_DAYS))})
+	frappe.db.commit()
@@ -0,0 +1,169 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, get_first_day, get_last_day, getdate, now
+
+FACT_DOCTYPE = "Sales Analytics Fact"
+FACT_DOC_TYPES = ("Sales Invoice", "Delivery Note", "Sales Order")
+FACTS_READY_KEY = "sales_analytics_facts_ready"
+
+
+class SalesAnalyticsFact(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index(FACT_DOCTYPE, ["doc_type", "company", "posting_date"])
+
+
+def is_fact_table_ready():
+	"""True once `rebuild_sales_analytics_facts` has backfilled the table"""
+	return bool(frappe.db.get_default(FACTS_READY_KEY))
+
+
+def get_date_field(doc_type):
+	return "transaction_date" if doc_type == "Sales Order" else "posting_date"
+
+
+# ------------------------------------------------------------------
+# DOC EVENTS
+# ------------------------------------------------------------------
+
+
+def enqueue_fact_refresh(doc, method=None):
+	"""
+	on_submit / on_cancel / on_update_after_submit of Sales Invoice, Delivery Note
+	and Sales Order: re-summarise the (doc_type, company, date) slice the document
+	belongs to once the transaction has been committed.
+	"""
+	frappe.enqueue(
+		refresh_sales_analytics_facts,
+		queue="short",
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+		doc_type=doc.doctype,
+		company=doc.company,
+		posting_date=doc.get(get_date_field(doc.doctype)),
+	)
+
+
+def refresh_sales_analytics_facts(doc_type, company, posting_date):
+	"""
+	Rebuild the facts of one (doc_type, company, date) slice from the submitted
+	documents. Recomputing the slice instead of adding/subtracting a single
+	document keeps the table exact across cancellations, amendments and
+	"Update Items" on submitted Sales Orders.
+	"""
+	frappe.db.delete(
+		FACT_DOCTYPE, {"doc_type": doc_type, "company": company, "posting_date": getdate(posting_date)}
+	)
+	insert_facts(
+		doc_type,
+		f"and parent.company = %(company)s and parent.{get_date_field(doc_type)} = %(posting_date)s",
+		{"company": company, "posting_date": getdate(posting_date)},
+	)
+
+	# results computed from the old facts are stale now
+	from customvinodreports.vinodreports.report.custom_sales_analytic_report.delta_refresh import (
+		record_change,
+	)
+	from customvinodreports.vinodreports.report.custom_sales_analytic_report.result_cache import invalidate
+
+	def after_commit():
+		invalidate(doc_type, company, posting_date)
+		# the change logged at the document's commit may have been read before the
+		# facts caught up; log it again so delta refreshes pick up the new facts
+		if is_fact_table_ready():
+			record_change(doc_type, company, posting_date)
+
+	frappe.db.after_commit.add(after_commit)
+
+
+# ------------------------------------------------------------------
+# BACKFILL
+# ------------------------------------------------------------------
+
+
+def rebuild_sales_analytics_facts(doc_types=None, from_date=None, to_date=None):
+	"""
+	Backfill the fact table from the transactional tables, one calendar month
+	per transaction. Usage: `bench --site <site> rebuild-sales-analytics-facts`
+	"""
+	for doc_type in doc_types or FACT_DOC_TYPES:
+		date_field = get_date_field(doc_type)
+		start, end = from_date, to_date
+		if not start or not end:
+			first, last = frappe.db.sql(
+				f"select min({date_field}), max({date_field}) from `tab{doc_type}` where docstatus = 1"
+			)[0]
+			if not first:
+				continue
+			start, end = start or first, end or last
+
+		month_start = get_first_day(start)
+		while month_start <= getdate(end):
+			month_from = max(getdate(start), month_start)
+			month_to = min(getdate(end), get_last_day(month_start))
+
+			frappe.db.delete(
+				FACT_DOCTYPE,
+				{"doc_type": doc_type, "posting_date": ("between", [month_from, month_to])},
+			)
+			insert_facts(
+				doc_type,
+				f"and parent.{date_field} between %(from_date)s and %(to_date)s",
+				{"from_date": month_from, "to_date": month_to},
+			)
+			frappe.db.commit()
+
+			month_start = add_days(get_last_day(month_start), 1)
+
+	frappe.db.set_default(FACTS_READY_KEY, 1)
+	frappe.db.commit()
+
+
+def insert_facts(doc_type, conditions, values):
+	"""
+	Summarise submitted lines of `doc_type` matching `conditions` into fact rows.
+
+	The row name is the MD5 of the key, so the same key always maps to the same
+	row. Every dimension is normalised with IFNULL, so NULL and '' cannot end
+	up as two rows with the same name.
+	"""
+	date_field = get_date_field(doc_type)
+	order_type = "ifnull(parent.order_type, '')" if doc_type == "Sales Order" else "''"
+	is_opening = "if(parent.is_opening = 'Yes', 1, 0)" if doc_type == "Sales Invoice" else "0"
+
+	dimensions = [
+		"parent.company",
+		f"parent.{date_field}",
+		"ifnull(parent.customer, '')",
+		"ifnull(child.item_code, '')",
+		"ifnull(child.item_group, '')",
+		"ifnull(parent.territory, '')",
+		order_type,
+		"ifnull(parent.project, '')",
+		is_opening,
+	]
+
+	frappe.db.sql(
+		f"""
+		insert into `tab{FACT_DOCTYPE}`
+			(name, creation, modified, owner, modified_by, docstatus, idx,
+			doc_type, company, posting_date, customer, item_code, item_group,
+			territory, order_type, project, is_opening,
+			base_net_amount, qty, stock_qty, line_count)
+		select
+			md5(concat_ws('|', %(doc_type)s, {", ".join(dimensions)})),
+			%(now)s, %(now)s, %(user)s, %(user)s, 0, 0,
+			%(doc_type)s, {", ".join(dimensions)},
+			sum(child.base_net_amount), sum(child.qty), sum(child.stock_qty), count(*)
+		from `tab{doc_type} Item` child
+		inner join `tab{doc_type}` parent on parent.name = child.parent
+		where parent.docstatus = 1 {conditions}
+		group by {", ".join(dimensions)}
+		""",
+		{**values, "doc_type": doc_type, "now": now(), "user": frappe.session.user},
+	)
@@ -1,5 +1,12 @@
 import frappe
 
+from customvinodreports.vinodreports.doctype.report_performance_sample.report_performance_sample import (
+    instrument_report,
+    report_phase,
+)
+
+
+@instrument_report("Custom Most selling item report which are out of stock")
 def execute(filters=None):
     filters = filters or {}
 
@@ -74,7 +81,8 @@ def get_data(filters):
         LIMIT 100
     """
 
-    rows = frappe.db.sql(sales_query, params, as_dict=True)
+    with report_phase("sales query"):
+        rows = frappe.db.sql(sales_query, params, as_dict=True)
 
     if not rows:
         return []
@@ -84,11 +92,12 @@ def get_data(filters):
     # --------------------------------------
     # STOCK (BIN) QUERY
     # --------------------------------------
-    bins = frappe.get_all(
-        "Bin",
-        filters={"item_code": ["in", item_codes]},
-        fields=["item_code", "warehouse", "actual_qty"]
-    )
+    with report_phase("stock query"):
+        bins = frappe.get_all(
+            "Bin",
+            filters={"item_code": ["in", item_codes]},
+            fields=["item_code", "warehouse", "actual_qty"]
+        )
 
     total_stock = {}
     for b in bins:
@@ -1,15 +1,25 @@
 import frappe
+from frappe.utils import add_months, getdate
 
+from customvinodreports.vinodreports.doctype.report_performance_sample.report_performance_sample import (
+    instrument_report,
+    report_phase,
+)
+
+
+@instrument_report("Custom Outstanding Debtors Month-wise")
 def execute(filters=None):
     if not filters:
         filters = {}
 
     # If user clicked a month → show invoice details
     if filters.get("due_month"):
-        return get_invoice_details(filters.get("due_month"))
+        with report_phase("invoice details"):
+            return get_invoice_details(filters.get("due_month"))
 
     # Show month summary
-    return get_month_summary()
+    with report_phase("month summary"):
+        return get_month_summary()
 
 
 # ------------------------------------------------------------
@@ -74,6 +84,8 @@ def get_month_summary():
 # 2. DETAILS VIEW (Invoice list for selected month)
 # ------------------------------------------------------------
 def get_invoice_details(month):
+    # a date range rather than DATE_FORMAT(due_date) so the due_date index can be used
+    from_date = getdate(f"{month}-01")
     data = frappe.db.sql("""
         SELECT
             si.name AS invoice_no,
@@ -85,9 +97,10 @@ def get_invoice_details(month):
         WHERE
               si.docstatus = 1
           AND si.outstanding_amount > 0
-          AND DATE_FORMAT(si.due_date, '%Y-%m') = %s
+          AND si.due_date >= %s
+          AND si.due_date < %s
         ORDER BY si.due_date ASC
-    """, (month,), as_dict=True)
+    """, (from_date, add_months(from_date, 1)), as_dict=True)
 
     columns = [
         {
@@ -0,0 +1,77 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+"""
+Chart series of Custom Sales Analytic Report.
+
+The report builds the top rows and the total line from its matrix (see
+`Analytics.get_chart_data`). Series of other rows are fetched here when the
+user checks them, from the same result the grid shows. Long ranges can be
+summed into at most `chart_max_points` points; a point then carries the sum
+of its periods and the label of the first one.
+"""
+
+import frappe
+import numpy as np
+from frappe import _
+from frappe.utils import cint
+
+REPORT_NAME = "Custom Sales Analytic Report"
+
+
+def get_bucket_size(period_count, max_points):
+    """Periods summed into one point: 1 unless there are more than `max_points`"""
+    if not max_points or period_count <= max_points:
+        return 1
+    return -(-period_count // max_points)
+
+
+def downsample_labels(labels, max_points):
+    return labels[:: get_bucket_size(len(labels), max_points)]
+
+
+def downsample(values, max_points):
+    """Per-period values summed into at most `max_points` points"""
+    values = np.asarray(values, dtype=float)
+    size = get_bucket_size(len(values), max_points)
+    if size == 1:
+        return values
+
+    padded = np.zeros(-(-len(values) // size) * size)
+    padded[: len(values)] = values
+    return padded.reshape(-1, size).sum(axis=1)
+
+
+@frappe.whitelist()
+def get_row_series(filters, entity):
+    """{"name": entity, "values": one list per measure} for a row of the grid"""
+    from customvinodreports.vinodreports.report.custom_sales_analytic_report.custom_sales_analytic_report import (
+        Analytics,
+    )
+
+    if not frappe.get_doc("Report", REPORT_NAME).is_permitted():
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+    # the grid's result is normally still in the result cache
+    analytics = Analytics({**frappe.parse_json(filters), "run_in_background": 0})
+    columns, rows = analytics.run()[:2]
+
+    row = next((row for row in rows if row.get("entity") == entity), None)
+    if not row:
+        frappe.throw(_("{0} is not a row of the report").format(entity))
+
+    # this year's cell of every period, per measure
+    period_columns = [column for column in columns if "period_slot" in column and not column["prior"]]
+    measures = sorted({column["measure"] for column in period_columns})
+    max_points = cint(analytics.filters.get("chart_max_points"))
+
+    return {
+        "name": entity,
+        "values": [
+            downsample(
+                [row.get(column["fieldname"]) or 0 for column in period_columns if column["measure"] == measure],
+                max_points,
+            ).tolist()
+            for measure in measures
+        ],
+    }
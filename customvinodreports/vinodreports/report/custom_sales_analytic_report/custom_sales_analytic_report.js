@@ -34,6 +34,7 @@ frappe.query_reports["Custom Sales Analytic Report"] = {
             options: [
                 { value: "Value", label: __("Value") },
                 { value: "Quantity", label: __("Quantity") },
+                { value: "Value and Quantity", label: __("Value and Quantity") },
             ],
             default: "Value",
             reqd: 1,
@@ -78,8 +79,133 @@ frappe.query_reports["Custom Sales Analytic Report"] = {
             label: __("Show Aggregate Value from Subsidiary Companies"),
             fieldtype: "Check",
         },
+        {
+            fieldname: "compare_with_previous_year",
+            label: __("Compare with Previous Year"),
+            fieldtype: "Check",
+        },
+        {
+            fieldname: "top_n",
+            label: __("Top N by Total"),
+            fieldtype: "Int",
+            depends_on: "eval:['Item', 'Project'].includes(doc.tree_type)",
+        },
+        {
+            fieldname: "sort_by_total",
+            label: __("Sort by Total"),
+            fieldtype: "Check",
+            depends_on: "eval:['Item', 'Project'].includes(doc.tree_type)",
+        },
+        {
+            fieldname: "chart_top_n",
+            label: __("Chart: Top Rows"),
+            fieldtype: "Int",
+            default: 5,
+        },
+        {
+            fieldname: "chart_max_points",
+            label: __("Chart: Max Points"),
+            fieldtype: "Int",
+            description: __("Sum consecutive periods so long ranges draw at most this many points"),
+        },
+        {
+            fieldname: "auto_refresh_minutes",
+            label: __("Auto Refresh (Minutes)"),
+            fieldtype: "Int",
+            on_change: () => schedule_refresh(frappe.query_report),
+        },
     ],
 
+    onload(report) {
+        // heavy selections run as a background job that reports its phase
+        frappe.realtime.off("custom_sales_analytics_progress");
+        frappe.realtime.on("custom_sales_analytics_progress", (data) => {
+            if (data.phase === "done" || data.phase === "cancelled") {
+                frappe.hide_progress();
+                report.page.remove_inner_button(__("Cancel Preparation"));
+                if (data.phase === "done") {
+                    report.refresh();
+                } else {
+                    frappe.show_alert({ message: __("Report preparation cancelled"), indicator: "orange" });
+                }
+                return;
+            }
+
+            frappe.show_progress(
+                __("Preparing Report"),
+                data.progress,
+                100,
+                __("Phase: {0}", [__(data.phase)])
+            );
+            report.page.remove_inner_button(__("Cancel Preparation"));
+            report.page.add_inner_button(__("Cancel Preparation"), () => {
+                frappe.call({
+                    method: "customvinodreports.vinodreports.report.custom_sales_analytic_report.custom_sales_analytic_report.cancel_background_run",
+                    args: { job_key: data.job_key },
+                });
+            });
+        });
+
+        // the whole report, streamed by the server instead of built from the loaded rows
+        const export_streamed = (file_format) => {
+            const args = new URLSearchParams({
+                filters: JSON.stringify(report.get_filter_values()),
+                file_format: file_format,
+            });
+            window.open(
+                "/api/method/customvinodreports.vinodreports.report.custom_sales_analytic_report.export.export_report?" +
+                    args.toString()
+            );
+        };
+        report.page.add_menu_item(__("Export CSV (streamed)"), () => export_streamed("CSV"));
+        report.page.add_menu_item(__("Export Excel (streamed)"), () => export_streamed("XLSX"));
+        report.page.add_menu_item(__("Refresh Changes"), () => refresh_changes(report));
+        schedule_refresh(report);
+    },
+
+    after_datatable_render() {
+        const report = frappe.query_report;
+
+        // double-click on a period cell lists the documents behind it
+        $(report.datatable.wrapper)
+            .off("dblclick.drilldown")
+            .on("dblclick.drilldown", ".dt-cell", function () {
+                const column = report.datatable.getColumn($(this).data("col-index"));
+                const row = report.datatable.datamanager.getData($(this).data("row-index"));
+                const docfield = column && column.docfield;
+                if (!row || !docfield || docfield.period_slot === undefined) return;
+                // the Others row sums the rows left off the page
+                if (row.entity === __("Others")) return;
+                show_cell_documents(report, row, docfield);
+            });
+
+        // with both measures the chart switches between them from the loaded rows
+        report.page.remove_inner_button(__("Chart: Switch Value / Qty"));
+        // every measure of each server-built line, for the switch and re-checked rows
+        report.chart_series = Object.assign({}, (report.raw_data.chart || {}).series);
+        report.chart_measure = 0;
+        if (report.get_filter_value("value_quantity") !== "Value and Quantity") return;
+
+        report.page.add_inner_button(__("Chart: Switch Value / Qty"), () => {
+            report.chart_measure = 1 - report.chart_measure;
+            const raw_data = report.chart.data;
+            const new_data = {
+                labels: raw_data.labels,
+                datasets: raw_data.datasets.map((dataset) => ({
+                    name: dataset.name,
+                    values: report.chart_series[dataset.name][report.chart_measure],
+                })),
+            };
+            report.render_chart(
+                Object.assign({}, report.chart_options, {
+                    data: new_data,
+                    fieldtype: report.chart_measure ? "Float" : "Currency",
+                })
+            );
+            report.raw_chart_data = new_data;
+        });
+    },
+
     get_datatable_options(options) {
         return Object.assign(options, {
             checkboxColumn: true,
@@ -87,53 +213,179 @@ frappe.query_reports["Custom Sales Analytic Report"] = {
                 onCheckRow: function (data) {
                     if (!data) return;
 
-                    const data_doctype = $(data[2].html)[0]
-                        .attributes.getNamedItem("data-doctype").value;
-                    const tree_type =
-                        frappe.query_report.filters[0].value;
-
-                    if (data_doctype != tree_type) return;
-
-                    const row_name = data[2].content;
-                    const raw_data = frappe.query_report.chart.data;
-
-                    const new_datasets = raw_data.datasets;
-                    const element_found = new_datasets.some(
-                        (element, index, array) => {
-                            if (element.name == row_name) {
-                                array.splice(index, 1);
-                                return true;
-                            }
-                            return false;
-                        }
-                    );
-
-                    const slice_at =
-                        { Customer: 4, Item: 5 }[tree_type] || 3;
-
-                    if (!element_found) {
-                        new_datasets.push({
-                            name: row_name,
-                            values: data
-                                .slice(slice_at, data.length - 1)
-                                .map((c) => c.content),
-                        });
+                    const report = frappe.query_report;
+                    const row = report.datatable.datamanager.getData(data[0].rowIndex);
+                    if (!row || !row.entity || row.entity === __("Others")) return;
+
+                    const row_name = row.entity;
+                    const datasets = report.chart.data.datasets;
+                    const index = datasets.findIndex((dataset) => dataset.name == row_name);
+
+                    if (index !== -1) {
+                        datasets.splice(index, 1);
+                        render_chart_datasets(report, datasets);
+                        return;
                     }
 
-                    const new_data = {
-                        labels: raw_data.labels,
-                        datasets: new_datasets,
+                    const add_series = (series) => {
+                        report.chart_series[row_name] = series;
+                        datasets.push({ name: row_name, values: series[report.chart_measure || 0] });
+                        render_chart_datasets(report, datasets);
                     };
 
-                    const new_options = Object.assign(
-                        {},
-                        frappe.query_report.chart_options,
-                        { data: new_data }
-                    );
-                    frappe.query_report.render_chart(new_options);
-                    frappe.query_report.raw_chart_data = new_data;
+                    if (report.chart_series[row_name]) {
+                        add_series(report.chart_series[row_name]);
+                        return;
+                    }
+
+                    // series are built by the server, downsampled like the rest of the chart
+                    frappe.call({
+                        method: "customvinodreports.vinodreports.report.custom_sales_analytic_report.chart.get_row_series",
+                        args: { filters: report.get_filter_values(), entity: row_name },
+                        callback: (r) => add_series(r.message.values),
+                    });
                 },
             },
         });
     },
 };
+
+function show_cell_documents(report, row, column) {
+    const dialog = new frappe.ui.Dialog({
+        title: __("{0}: {1}", [row.entity, column.label]),
+        size: "large",
+        fields: [{ fieldname: "documents", fieldtype: "HTML" }],
+        primary_action_label: __("Load More"),
+        primary_action: () => load_page(),
+    });
+    const $wrapper = dialog.fields_dict.documents.$wrapper;
+    const measures = ["value_field", "qty_field"];
+    let next = {};
+
+    const load_page = () => {
+        frappe.call({
+            method: "customvinodreports.vinodreports.report.custom_sales_analytic_report.drilldown.get_cell_documents",
+            args: Object.assign(
+                {
+                    filters: report.get_filter_values(),
+                    entity: row.entity,
+                    // customer rows of the Customer Group tree carry the customer id
+                    customer: row.customer,
+                    period_slot: column.period_slot,
+                    prior: column.prior,
+                },
+                next
+            ),
+            callback: (r) => {
+                const page = r.message;
+                if (!$wrapper.find("table").length) {
+                    $wrapper.html(`
+                        <p class="text-muted">${frappe.datetime.str_to_user(page.from_date)}
+                            - ${frappe.datetime.str_to_user(page.to_date)}</p>
+                        <table class="table table-bordered"><tbody></tbody></table>
+                    `);
+                }
+                const $body = $wrapper.find("tbody");
+                page.documents.forEach((d) => {
+                    const cells = measures
+                        .filter((measure) => measure in d)
+                        .map((measure) => `<td class="text-right">${format_number(d[measure])}</td>`);
+                    $body.append(`<tr>
+                        <td><a href="/app/${frappe.router.slug(page.doctype)}/${encodeURIComponent(d.name)}"
+                            target="_blank">${frappe.utils.escape_html(d.name)}</a></td>
+                        <td>${frappe.datetime.str_to_user(d.posting_date)}</td>
+                        <td>${frappe.utils.escape_html(d.party || "")}</td>
+                        ${cells.join("")}
+                    </tr>`);
+                });
+                next = page.next || {};
+                dialog.get_primary_btn().toggle(!!page.next);
+            },
+        });
+    };
+
+    dialog.show();
+    load_page();
+}
+
+function schedule_refresh(report) {
+    // wallboards refresh on a timer; each tick patches only what changed
+    clearInterval(report.auto_refresh_timer);
+    const minutes = report.get_filter_value("auto_refresh_minutes");
+    if (minutes > 0) {
+        report.auto_refresh_timer = setInterval(() => refresh_changes(report), minutes * 60 * 1000);
+    }
+}
+
+function refresh_changes(report) {
+    // the version token of the shown result travels in its chart
+    const chart = report.raw_data && report.raw_data.chart;
+    if (!chart || chart.version === undefined) {
+        report.refresh();
+        return;
+    }
+
+    frappe.call({
+        method: "customvinodreports.vinodreports.report.custom_sales_analytic_report.delta_refresh.get_report_delta",
+        args: { filters: report.get_filter_values(), version: chart.version },
+        callback: (r) => {
+            const delta = r.message;
+            if (delta.full) {
+                report.refresh();
+                return;
+            }
+
+            const col_index = {};
+            report.datatable.getColumns().forEach((column) => {
+                if (column.docfield) col_index[column.docfield.fieldname] = column.colIndex;
+            });
+
+            const changed_rows = new Set();
+            delta.cells.forEach(([row_index, fieldname, value]) => {
+                report.data[row_index][fieldname] = value;
+                report.datatable.cellmanager.updateCell(col_index[fieldname], row_index, value, true);
+                changed_rows.add(report.data[row_index]);
+            });
+            chart.version = delta.version;
+
+            if (changed_rows.size) update_chart_rows(report, changed_rows, delta.totals || {});
+        },
+    });
+}
+
+function render_chart_datasets(report, datasets) {
+    const new_data = { labels: report.chart.data.labels, datasets: datasets };
+    report.render_chart(Object.assign({}, report.chart_options, { data: new_data }));
+    report.raw_chart_data = new_data;
+}
+
+function update_chart_rows(report, rows, totals) {
+    // series of the checked rows, one per measure, from the current-year period cells
+    const period_columns = report.columns.filter((column) => column.period_slot !== undefined && !column.prior);
+    const measure_fieldnames = [0, 1].map((measure) =>
+        period_columns.filter((column) => column.measure === measure).map((column) => column.fieldname)
+    );
+    // row points of a downsampled chart do not map to single cells
+    const by_name = {};
+    if (measure_fieldnames[0].length === report.chart.data.labels.length) {
+        rows.forEach((row) => (by_name[row.entity] = row));
+    }
+
+    const raw_data = report.chart.data;
+    let changed = false;
+    raw_data.datasets.forEach((dataset) => {
+        const row = by_name[dataset.name];
+        let series = totals[dataset.name];
+        if (row) {
+            series = measure_fieldnames
+                .filter((fieldnames) => fieldnames.length)
+                .map((fieldnames) => fieldnames.map((fieldname) => row[fieldname]));
+        }
+        // the total lines come built (and downsampled) by the server
+        if (!series) return;
+        report.chart_series[dataset.name] = series;
+        dataset.values = series[report.chart_measure || 0];
+        changed = true;
+    });
+    if (changed) render_chart_datasets(report, raw_data.datasets);
+}
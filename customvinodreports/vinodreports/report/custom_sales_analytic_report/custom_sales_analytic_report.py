@@ -1,19 +1,159 @@
 # Copyright (c) 2013, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import heapq
+import os
+import time
+from contextlib import nullcontext
+from itertools import islice
+
 import frappe
-from frappe import _, scrub
-from frappe.query_builder import DocType
-from frappe.query_builder.functions import IfNull
-from frappe.utils import add_days, add_to_date, flt, getdate
+import numpy as np
+from frappe import _
+from frappe.query_builder import Case, DocType
+from frappe.query_builder.functions import Count, IfNull, Max, Sum
+from frappe.utils import add_days, add_to_date, cint, flt, formatdate, get_last_day, getdate
 
 from erpnext.accounts.utils import get_fiscal_year
 
-
+from customvinodreports.vinodreports.doctype.report_performance_sample.report_performance_sample import (
+    instrument_report,
+    report_phase,
+)
+from customvinodreports.vinodreports.doctype.sales_analytics_fact.sales_analytics_fact import (
+    FACT_DOC_TYPES,
+    FACT_DOCTYPE,
+    is_fact_table_ready,
+)
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.chart import (
+    downsample,
+    downsample_labels,
+)
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.delta_refresh import (
+    get_version,
+    set_snapshot,
+)
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.matrix import (
+    EntityPeriodMatrix,
+    rollup_nested_set,
+)
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.parallel_fetch import (
+    SHARD_MAPS,
+    SHARD_SET_MAPS,
+    fetch_in_parallel,
+    merge_lookups,
+)
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.period_cache import (
+    get_cached_period,
+    set_cached_periods,
+)
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.period_index import PeriodIndex
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.result_cache import (
+    get_cache_key,
+    get_cache_meta,
+    get_cached_result,
+    set_cached_result,
+)
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.sales_cube import (
+    CUBE_MEASURES,
+    CUBE_TREE_TYPES,
+    DEFAULT_CUBE_MEASURES,
+    LINE_TREE_TYPES,
+    MAX_ROWS as MAX_CUBE_ROWS,
+    get_cached_cube,
+    get_other_tree_types,
+    has_cached_cube,
+    set_cached_cube,
+)
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.tree_cache import (
+    get_company_list,
+    get_group_tree,
+    get_order_type_tree,
+)
+
+
+# measure columns of Sales Analytics Fact for the transaction fields the report sums
+FACT_MEASURES = {"base_net_total": "base_net_amount", "total_qty": "qty"}
+
+SUPPLIER_TREE_TYPES = ("Supplier", "Supplier Group")
+VALUE_AND_QUANTITY = "Value and Quantity"
+
+# runs that would scan more source rows than this are queued as a background job
+BACKGROUND_THRESHOLD_ROWS = 50000
+BACKGROUND_TIMEOUT = 60 * 60
+PROGRESS_EVENT = "custom_sales_analytics_progress"
+PROGRESS_PHASES = ("fetch", "bucket", "roll-up", "chart", "done")
+# result of a background run, kept apart from the result cache until the client has read it
+JOB_RESULT_KEY = "custom_sales_analytics_job_result"
+
+
+# foreground runs stop fetching after this share of the HTTP timeout and return what they have
+DEFAULT_TIME_BUDGET_SHARE = 0.75
+# number of date windows the entry query is split into when a time budget applies
+FETCH_WINDOWS = 8
+# runs estimated below this many source rows are fetched in one go even with a time budget
+SMALL_RUN_ROWS = 10000
+CANCEL_KEY = "custom_sales_analytics_cancel"
+
+# worker processes fetching one company each when subsidiaries are included; background runs
+# use them by default, web requests only when the parallel_workers filter asks for them
+DEFAULT_PARALLEL_WORKERS = min(os.cpu_count() or 1, 8)
+# below this many source rows, starting the worker processes costs more than the serial query
+PARALLEL_THRESHOLD_ROWS = 100000
+
+# Item / Project rows returned without paging; beyond this the rest is one "Others" row
+MAX_UNPAGED_ROWS = 5000
+
+# entry rows read from the cursor and folded into the matrix at a time
+FETCH_CHUNK_ROWS = 10000
+
+# rows drawn in the chart unless chart_top_n says otherwise
+DEFAULT_CHART_TOP_N = 5
+
+
+class AnalyticsRunCancelled(frappe.ValidationError):
+    pass
+
+
+@instrument_report("Custom Sales Analytic Report")
 def execute(filters=None):
     return Analytics(filters).run()
 
 
+def run_in_background(filters, job_key):
+    """
+    Background job for heavy runs. The result is kept under the job key, where
+    the next run with the same filters picks it up (see `pop_job_result`); it
+    also goes into the result cache, which document changes may clear first.
+    """
+    analytics = Analytics({**filters, "in_background": 1, "skip_cache": 0})
+    analytics.job_key = job_key
+    try:
+        analytics.run()
+    except AnalyticsRunCancelled:
+        analytics.publish_progress("cancelled")
+    finally:
+        frappe.cache.delete_value(f"{CANCEL_KEY}:{job_key}")
+
+
+def pop_job_result(job_key):
+    """Result of the background run `job_key`, once; None while it has not finished"""
+    key = f"{JOB_RESULT_KEY}:{job_key}"
+    result = frappe.cache.get_value(key)
+    if result is not None:
+        frappe.cache.delete_value(key)
+    return result
+
+
+@frappe.whitelist()
+def cancel_background_run(job_key):
+    """Ask a queued run to stop at its next fetch window or phase boundary"""
+    if not frappe.get_doc("Report", "Custom Sales Analytic Report").is_permitted():
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+    frappe.cache.set_value(f"{CANCEL_KEY}:{job_key}", 1, expires_in_sec=BACKGROUND_TIMEOUT)
+
+
 class Analytics:
     def __init__(self, filters=None):
         self.filters = frappe._dict(filters or {})
@@ -36,36 +176,196 @@ class Analytics:
             "Nov",
             "Dec",
         ]
+        # Let the database sum rows per entity and period bucket instead of
+        # shipping every transaction to Python (set aggregate_in_db=0 to disable)
+        self.aggregate_in_db = cint(self.filters.get("aggregate_in_db", 1))
+        # Read pre-summed daily rows from Sales Analytics Fact once it has been backfilled;
+        # facts carry no supplier, so the supplier trees always read the transactions
+        self.use_fact_table = (
+            self.filters.doc_type in FACT_DOC_TYPES
+            and self.filters.tree_type not in SUPPLIER_TREE_TYPES
+            and cint(self.filters.get("use_fact_table", is_fact_table_ready()))
+        )
+        # Serve repeated runs with the same filters from the result cache
+        self.use_cache = not cint(self.filters.get("skip_cache"))
+        # Filters as given, before the company list is expanded; re-used by a queued run
+        self.raw_filters = dict(filters or {})
+        self.in_background = cint(self.filters.get("in_background"))
+        # Seconds after which fetching stops and the periods done so far are returned
+        self.time_budget = flt(self.filters.get("time_budget")) or None
+        self.partial = False
+        self.estimated_rows = None
+        # Item / Project rows returned without paging; None returns them all (exports)
+        self.row_limit = MAX_UNPAGED_ROWS
+        # translated while the request is set up: a streamed export builds its rows after teardown
+        self.others_labels = (_("Others"), _("{0} more"))
+        # slot -> (entities, values, lookups) of closed periods served from the period cache
+        self.cached_periods = {}
+        # "Value and Quantity" sums both measures in the same scan, as paired columns
+        self.measures = (
+            ("value_field", "qty_field")
+            if self.filters.value_quantity == VALUE_AND_QUANTITY
+            else ("value_field",)
+        )
+        # Same periods one year earlier, fetched in the same query, with change and growth columns
+        self.compare = cint(self.filters.get("compare_with_previous_year"))
+        # Worker processes used to fetch subsidiary companies in parallel (1 = serial)
+        self.parallel_workers = cint(
+            self.filters.get("parallel_workers") or (DEFAULT_PARALLEL_WORKERS if self.in_background else 1)
+        )
         self.get_period_date_ranges()
+        if self.compare:
+            self.get_prior_date_ranges()
 
     def update_company_list_for_parent_company(self):
-        company_list = [self.filters.get("company")]
-
         selected_company = self.filters.get("company")
-        if (
-            selected_company
-            and self.filters.get("show_aggregate_value_from_subsidiary_companies")
-            and frappe.db.get_value("Company", selected_company, "is_group")
-        ):
-            lft, rgt = frappe.db.get_value("Company", selected_company, ["lft", "rgt"])
-            child_companies = frappe.db.get_list(
-                "Company", filters={"lft": [">", lft], "rgt": ["<", rgt]}, pluck="name"
-            )
-
-            company_list.extend(child_companies)
+        self.filters["company"] = get_company_list(
+            selected_company,
+            include_subsidiaries=bool(
+                selected_company and self.filters.get("show_aggregate_value_from_subsidiary_companies")
+            ),
+        )
 
-        self.filters["company"] = company_list
+    def run(self, time_budget=None):
+        self.started_at = time.monotonic()
+        if time_budget is not None:
+            self.time_budget = time_budget
+        elif self.time_budget is None and not self.in_background:
+            self.time_budget = cint(frappe.conf.get("http_timeout") or 120) * DEFAULT_TIME_BUDGET_SHARE
 
-    def run(self):
         self.update_company_list_for_parent_company()
-        self.get_columns()
+        # token of the changes this run sees; a delta refresh sends it back
+        self.version = get_version()
+
+        with report_phase("cache lookup"):
+            result = get_cached_result(self.filters) if self.use_cache else None
+            if not result and self.use_cache and not self.in_background:
+                result = pop_job_result(get_cache_key(get_cache_meta(self.filters)))
+        if result:
+            # a queued run that finds its result cached still hands it over
+            self.keep_job_result(result)
+            self.publish_progress("done")
+            return result
+
+        with report_phase("columns"):
+            self.build_period_index()
+            self.get_columns()
+            self.load_cached_periods()
+
+        if self.should_run_in_background():
+            return self.enqueue_background_run()
+
+        self.publish_progress("fetch")
         self.get_data()
-        self.get_chart_data()
+        self.check_cancelled()
+        self.publish_progress("chart")
+        with report_phase("chart"):
+            self.get_chart_data()
+        self.chart["version"] = self.version
 
         # Show total row at the bottom (user requested final total)
         skip_total_row = 0
 
-        return self.columns, self.data, None, self.chart, None, skip_total_row
+        message = None
+        if self.partial:
+            message = _(
+                "The time budget ran out: showing the first {0} periods, up to {1}. "
+                "Narrow the date range or pick a coarser Range to see the rest."
+            ).format(len(self.period_index), formatdate(self.periodic_daterange[-1]))
+
+        result = self.columns, self.data, message, self.chart, None, skip_total_row
+        # a partial result must not be served to the next run
+        if self.use_cache and not self.partial:
+            with report_phase("cache store"):
+                set_cached_result(self.filters, result)
+                set_snapshot(self.filters, self.version, self.data)
+        self.keep_job_result(result)
+
+        self.publish_progress("done")
+        return result
+
+    # ----------------------------------------------------------------------
+    # BACKGROUND RUNS
+    # ----------------------------------------------------------------------
+
+    def should_run_in_background(self):
+        """
+        Queue the run when it would scan more than BACKGROUND_THRESHOLD_ROWS source
+        rows. The run_in_background filter (1 / 0) forces either way.
+        """
+        # the queued result is handed back under the job key by the next run with these filters
+        if self.in_background or not self.use_cache or frappe.flags.in_test:
+            return False
+
+        if self.filters.get("run_in_background") not in (None, ""):
+            return bool(cint(self.filters.run_in_background))
+
+        # another view of a cached cube needs no scan
+        if self.use_sales_cube() and has_cached_cube(self.filters):
+            return False
+
+        self.estimated_rows = self.estimate_source_rows()
+        return self.estimated_rows > BACKGROUND_THRESHOLD_ROWS
+
+    def estimate_source_rows(self):
+        """Rows the entry query will read, counted on the same indexed filters"""
+        uncached = [slot for slot in range(len(self.period_index)) if slot not in self.cached_periods]
+        if not uncached:
+            return 0
+
+        if self.filters.tree_type in ["Item", "Item Group"]:
+            query, doctype, _doctype_item = self.get_item_query()
+        else:
+            doctype = self.get_header_table()
+            query = frappe.qb.from_(doctype).where(self.get_header_conditions(doctype, exclude_opening=False))
+
+        if self.cached_periods and not self.compare:
+            # only periods missing from the period cache are read
+            query = query.where(self.get_date_column(doctype) >= self.period_index.start_dates[uncached[0]])
+
+        return cint(query.select(Count("*")).run()[0][0])
+
+    def enqueue_background_run(self):
+        job_key = get_cache_key(get_cache_meta(self.filters))
+        frappe.enqueue(
+            run_in_background,
+            queue="long",
+            timeout=BACKGROUND_TIMEOUT,
+            job_id=f"custom_sales_analytics::{job_key}",
+            deduplicate=True,
+            filters=self.raw_filters,
+            job_key=job_key,
+        )
+
+        message = _(
+            "This selection covers a large number of transactions and is being prepared in the background. "
+            "The report will refresh on its own once it is ready."
+        )
+        return self.columns, [], message, None, None, 0
+
+    def keep_job_result(self, result):
+        """Hand the result of a background run to the client, whatever happens to the result cache"""
+        if getattr(self, "job_key", None):
+            frappe.cache.set_value(f"{JOB_RESULT_KEY}:{self.job_key}", result, expires_in_sec=BACKGROUND_TIMEOUT)
+
+    def publish_progress(self, phase):
+        """Tell the user who queued a background run which phase it has reached"""
+        if not self.in_background:
+            return
+
+        frappe.publish_realtime(
+            PROGRESS_EVENT,
+            {
+                "job_key": getattr(self, "job_key", None),
+                "phase": phase,
+                "progress": (
+                    100 * PROGRESS_PHASES.index(phase) // (len(PROGRESS_PHASES) - 1)
+                    if phase in PROGRESS_PHASES
+                    else 100
+                ),
+            },
+            user=frappe.session.user,
+        )
 
     # ----------------------------------------------------------------------
     # COLUMN SETUP
@@ -104,76 +404,373 @@ class Analytics:
                 }
             )
 
-        for end_date in self.periodic_daterange:
-            period = self.get_period(end_date)
-            self.columns.append(
-                {"label": _(period), "fieldname": scrub(period), "fieldtype": "Float", "width": 120}
-            )
+        # fieldnames of the cells of a row, in `expand_cells` order, and of its totals
+        self.cell_fieldnames = []
+        self.total_fieldnames = []
+
+        for slot, (period, fieldname) in enumerate(self.period_index.columns()):
+            columns = self.get_cell_columns(_(period), fieldname, slot)
+            self.columns.extend(columns)
+            self.cell_fieldnames.extend(d["fieldname"] for d in columns)
+
+        columns = self.get_cell_columns(_("Total"), "total")
+        self.columns.extend(columns)
+        self.total_fieldnames.extend(d["fieldname"] for d in columns)
 
-        self.columns.append({"label": _("Total"), "fieldname": "total", "fieldtype": "Float", "width": 120})
+    def get_cell_columns(self, label, fieldname, slot=None):
+        """
+        Columns of one period, or of the totals: one per measure, each followed by
+        its last year, change and growth % columns in comparison mode. Period
+        columns that sum documents carry their slot, for the cell drill-down.
+        """
+        measures = [("", "")]
+        if len(self.measures) > 1:
+            measures = [(_("Value"), ""), (_("Qty"), "_qty")]
+
+        variants = [("", "", "Float")]
+        if self.compare:
+            variants += [
+                (_("Last Year"), "_prior", "Float"),
+                (_("Change"), "_delta", "Float"),
+                (_("Growth %"), "_growth", "Percent"),
+            ]
+
+        columns = []
+        for measure, (measure_label, measure_suffix) in enumerate(measures):
+            measure_column_label = f"{label} ({measure_label})" if measure_label else label
+            for variant_label, variant_suffix, fieldtype in variants:
+                column = {
+                    "label": f"{measure_column_label} {variant_label}" if variant_label else measure_column_label,
+                    "fieldname": f"{fieldname}{measure_suffix}{variant_suffix}",
+                    "fieldtype": fieldtype,
+                    "width": 120,
+                }
+                if slot is not None and variant_suffix in ("", "_prior"):
+                    column.update(
+                        {"period_slot": slot, "prior": int(variant_suffix == "_prior"), "measure": measure}
+                    )
+                columns.append(column)
+        return columns
 
     # ----------------------------------------------------------------------
     # DATA FETCH
     # ----------------------------------------------------------------------
 
     def get_data(self):
+        self.data = []
+        with report_phase("fetch"):
+            has_rows = self.collect_data()
+        if has_rows:
+            with report_phase("rows"):
+                self.data = list(self.iter_rows())
+
+    def collect_data(self):
+        """
+        Fill the entity x period matrix and load the tree the rows hang from.
+        False when the selection cannot have rows.
+        """
+        self.init_periodic_data()
+
+        if self.filters.tree_type == "Order Type" and self.filters.doc_type != "Sales Order":
+            return False
+
+        with report_phase("period cache"):
+            self.add_cached_periods()
+        if len(self.cached_periods) < len(self.period_index):
+            with report_phase("query"):
+                if self.use_sales_cube() and self.fetch_from_cube():
+                    # served from (or built into) the sales cube
+                    pass
+                elif self.use_parallel_fetch():
+                    fetch_in_parallel(self)
+                else:
+                    self.fetch_data()
+            with report_phase("period cache store"):
+                self.store_closed_periods()
+
+        self.finish_periodic_data()
+
+        with report_phase("tree"):
+            if self.filters.tree_type == "Order Type":
+                self.get_teams()
+            elif self.filters.tree_type in ["Customer Group", "Supplier Group", "Territory", "Item Group"]:
+                self.get_groups()
+        return True
+
+    def fetch_data(self):
+        """Fold the entries of the selected tree type into the matrix"""
         if self.filters.tree_type in ["Customer", "Supplier"]:
             # Customer: supports custom_sub_group via Customer doctypes
             self.get_sales_transactions_based_on_customers_or_suppliers()
-            self.get_rows_for_customer_or_supplier()
 
         elif self.filters.tree_type == "Item":
             self.get_sales_transactions_based_on_items()
-            self.get_rows()
 
         elif self.filters.tree_type in ["Customer Group", "Supplier Group", "Territory"]:
             self.get_sales_transactions_based_on_customer_or_territory_group()
-            self.get_rows_by_group()
 
         elif self.filters.tree_type == "Item Group":
             self.get_sales_transactions_based_on_item_group()
-            self.get_rows_by_group()
 
         elif self.filters.tree_type == "Order Type":
-            if self.filters.doc_type != "Sales Order":
-                self.data = []
-                return
             self.get_sales_transactions_based_on_order_type()
-            self.get_rows_by_group()
 
         elif self.filters.tree_type == "Project":
             self.get_sales_transactions_based_on_project()
-            self.get_rows()
+
+    def iter_rows(self):
+        """
+        Rows of the report one at a time, built from the collected matrix and
+        lookups only, so no query runs while they are generated.
+        """
+        if self.filters.tree_type in ["Customer", "Supplier"]:
+            yield from self.iter_rows_for_customer_or_supplier()
+
+        elif self.filters.tree_type in ["Item", "Project"]:
+            yield from self.iter_entity_rows()
+
+        else:
+            yield from self.iter_rows_by_group()
+
+    # ----------------------------------------------------------------------
+    # PERIOD CACHE
+    # ----------------------------------------------------------------------
+
+    def load_cached_periods(self):
+        """Closed periods with the same filters computed by an earlier run"""
+        if not self.use_cache:
+            return
+
+        for slot in range(len(self.period_index)):
+            if self.is_closed_period(slot):
+                period = get_cached_period(self.filters, self.get_slot_date_ranges(slot))
+                if period:
+                    self.cached_periods[slot] = period
+
+    def add_cached_periods(self):
+        for slot, (entities, values, lookups) in self.cached_periods.items():
+            self.matrix.add(entities, [slot] * len(entities), values)
+            merge_lookups(self, lookups)
+
+    def store_closed_periods(self):
+        """Cache the closed periods this run fetched, for runs that only move to_date"""
+        if not self.use_cache:
+            return
+
+        lookups = {attr: getattr(self, attr, None) for attr in SHARD_MAPS + SHARD_SET_MAPS}
+        periods = []
+        for slot in range(len(self.period_index)):
+            if slot not in self.cached_periods and self.is_closed_period(slot):
+                entities, values = self.matrix.get_slot_values(slot)
+                periods.append((self.get_slot_date_ranges(slot), entities, values, lookups))
+
+        set_cached_periods(self.filters, periods)
+
+    def is_closed_period(self, slot):
+        """A period is closed once its last day has passed"""
+        return self.period_index.end_dates[slot] < getdate()
+
+    def get_slot_date_ranges(self, slot):
+        """Date ranges the entries of `slot` come from; the first period starts at from_date"""
+        date_ranges = [
+            (
+                max(self.period_index.start_dates[slot], getdate(self.filters.from_date)),
+                self.period_index.end_dates[slot],
+            )
+        ]
+        if self.compare:
+            date_ranges.append(
+                (max(self.prior_index.start_dates[slot], self.prior_from_date), self.prior_index.end_dates[slot])
+            )
+        return date_ranges
+
+    # ----------------------------------------------------------------------
+    # SALES CUBE
+    # ----------------------------------------------------------------------
+
+    def use_sales_cube(self):
+        """Serve the tree types that are projections of the sales cube from it (set use_sales_cube=0 to disable)"""
+        return (
+            self.filters.tree_type in CUBE_TREE_TYPES
+            and self.use_cache
+            and self.aggregate_in_db
+            and cint(self.filters.get("use_sales_cube", 1))
+        )
+
+    def fetch_from_cube(self):
+        """
+        Fold the missing periods in from the cached cube. Without one, build it
+        when it is likely to be reused and small enough to be cached; False
+        otherwise, so the run falls back to the query of its tree type.
+        """
+        rows = get_cached_cube(self.filters)
+        if rows is not None:
+            self.add_cube_entries(rows)
+            return True
+
+        other_tree_types = get_other_tree_types(self.filters)
+        if self.cached_periods or self.use_parallel_fetch():
+            return False
+
+        # header trees read only headers on their own; the line-level cube pays off
+        # once the user switches tree type on the same selection
+        if self.filters.tree_type not in LINE_TREE_TYPES and not other_tree_types:
+            return False
+
+        # a web request builds no more than it would have been allowed to scan before queuing
+        max_rows = MAX_CUBE_ROWS if self.in_background else min(MAX_CUBE_ROWS, BACKGROUND_THRESHOLD_ROWS)
+        if self.estimate_cube_rows() > max_rows:
+            return False
+
+        self.build_sales_cube()
+        return True
+
+    def estimate_cube_rows(self):
+        """Lines the cube query reads, an upper bound on its rows"""
+        if self.filters.tree_type in LINE_TREE_TYPES and self.estimated_rows is not None:
+            # estimate_source_rows counted the same lines
+            return self.estimated_rows
+
+        query, _doctype, _doctype_item = self.get_item_query()
+        return cint(query.select(Count("*")).run()[0][0])
+
+    def build_sales_cube(self):
+        """Fetch the cube once, folding each chunk into this tree type while keeping the rows for the cache"""
+        query, fields, measure_columns, date_column, attributes = self.get_cube_query()
+
+        rows = []
+        for entries in self.fetch_entries(query, fields, measure_columns, date_column, attributes):
+            if rows is not None:
+                rows.extend(entries)
+                if len(rows) > MAX_CUBE_ROWS:
+                    rows = None
+            self.add_cube_entries(entries)
+
+        # a cube cut short by the time budget misses periods
+        if rows is not None and not self.partial:
+            set_cached_cube(self.filters, rows)
+
+    def get_cube_query(self):
+        """(query, fields, measure columns, date column, attributes) of the line-level cube"""
+        query, doctype, doctype_item = self.get_item_query()
+        customer = DocType("Customer")
+        query = query.join(customer).on(doctype.customer == customer.name)
+
+        fields = {
+            "customer": doctype.customer,
+            "territory": doctype.territory,
+            "project": doctype.project,
+            "item_code": doctype_item.item_code,
+            "item_group": doctype_item.item_group,
+        }
+        if self.filters.doc_type == "Sales Order":
+            fields["order_type"] = doctype.order_type
+        if self.use_fact_table or self.filters.doc_type == "Sales Invoice":
+            fields["is_opening"] = doctype.is_opening
+
+        attributes = {
+            "customer_name": customer.customer_name,
+            "custom_sub_group": customer.custom_sub_group,
+            "customer_group": customer.customer_group,
+        }
+        if self.use_fact_table:
+            item = DocType("Item")
+            query = query.left_join(item).on(item.name == doctype_item.item_code)
+            attributes.update({"item_name": item.item_name, "stock_uom": item.stock_uom})
+        else:
+            attributes.update({"item_name": doctype_item.item_name, "stock_uom": doctype_item.stock_uom})
+
+        measure_columns = {
+            "base_net_amount": doctype_item.base_net_amount,
+            "qty": doctype_item.qty,
+            "stock_qty": doctype_item.stock_qty,
+        }
+        return query, fields, measure_columns, self.get_date_column(doctype), attributes
+
+    def add_cube_entries(self, rows):
+        """Project cube rows onto the entries of this tree type and fold them in"""
+        tree_type = self.filters.tree_type
+        value_measure, qty_measure = CUBE_MEASURES.get(tree_type, DEFAULT_CUBE_MEASURES)
+        if self.filters.value_quantity == "Quantity":
+            measures = {"value_field": qty_measure}
+        else:
+            measures = {"value_field": value_measure, "qty_field": qty_measure}
+
+        # same row selection as the tree type's own query
+        exclude_opening = tree_type in ("Territory", "Project")
+        entity_field = {
+            "Territory": "territory",
+            "Item Group": "item_group",
+            "Item": "item_code",
+            "Project": "project",
+            "Order Type": "order_type",
+        }.get(tree_type)
+
+        entries = []
+        for d in rows:
+            slot, _prior = self.get_entry_slot(d.get(self.date_field))
+            if slot is None or slot in self.cached_periods:
+                continue
+            if exclude_opening and d.get("is_opening") in ("Yes", 1):
+                continue
+
+            entry = frappe._dict(d)
+            for alias, measure in measures.items():
+                entry[alias] = d.get(measure)
+            if entity_field:
+                entry.entity = d.get(entity_field)
+                if not entry.entity:
+                    continue
+            entries.append(entry)
+
+        if tree_type == "Customer":
+            self.add_customer_entries(entries)
+        elif tree_type == "Customer Group":
+            self.add_customer_group_entries(entries)
+        else:
+            if tree_type == "Item":
+                for d in entries:
+                    self.entity_names.setdefault(d.entity, d.item_name)
+                    d.entity_name = d.item_name
+            self.add_periodic_data(entries)
+
+    def use_parallel_fetch(self):
+        """
+        Fetch per company in worker processes when several companies are reported
+        together and the selection is large enough to pay for starting them
+        """
+        if self.parallel_workers <= 1 or len(self.filters.company) <= 1 or frappe.flags.in_test:
+            return False
+
+        if self.estimated_rows is None:
+            self.estimated_rows = self.estimate_source_rows()
+        return self.estimated_rows > PARALLEL_THRESHOLD_ROWS
 
     # ----------------------------------------------------------------------
     # ORIGINAL / BASE QUERIES
     # ----------------------------------------------------------------------
 
     def get_sales_transactions_based_on_order_type(self):
-        if self.filters["value_quantity"] == "Value":
-            value_field = "base_net_total"
-        else:
-            value_field = "total_qty"
+        value_field = "base_net_total"
+        qty_field = "total_qty"
 
-        doctype = DocType(self.filters.doc_type)
+        doctype = self.get_header_table()
 
-        self.entries = (
+        query = (
             frappe.qb.from_(doctype)
-            .select(
-                doctype.order_type.as_("entity"),
-                doctype[self.date_field],
-                doctype[value_field].as_("value_field"),
-            )
             .where(
-                (doctype.docstatus == 1)
-                & (doctype.company.isin(self.filters.company))
-                & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
+                self.get_header_conditions(doctype, exclude_opening=False)
                 & (IfNull(doctype.order_type, "") != "")
             )
             .orderby(doctype.order_type)
-        ).run(as_dict=True)
-
-        self.get_teams()
+        )
+        for entries in self.fetch_entries(
+            query,
+            {"entity": doctype.order_type},
+            self.get_measure_columns(doctype, value_field, qty_field),
+            self.get_date_column(doctype),
+        ):
+            self.add_periodic_data(entries)
 
     def get_sales_transactions_based_on_customers_or_suppliers(self):
         """
@@ -181,130 +778,97 @@ class Analytics:
         - Supplier (original behaviour)
         - Customer with sub-groups (new: join Customer to fetch custom_sub_group)
         """
-        if self.filters["value_quantity"] == "Value":
-            value_field = "base_net_total"
-        else:
-            value_field = "total_qty"
+        value_field = "base_net_total"
+        qty_field = "total_qty"
 
         # Supplier path (unchanged)
         if self.filters.tree_type == "Supplier":
-            entity = "supplier as entity"
-            entity_name = "supplier_name as entity_name"
-            filters = {
-                "docstatus": 1,
-                "company": ["in", self.filters.company],
-                self.date_field: ("between", [self.filters.from_date, self.filters.to_date]),
-            }
-            if self.filters.doc_type in ["Sales Invoice", "Purchase Invoice", "Payment Entry"]:
-                filters.update({"is_opening": "No"})
-
-            self.entries = frappe.get_all(
-                self.filters.doc_type,
-                fields=[entity, entity_name, f"{value_field} as value_field", self.date_field],
-                filters=filters,
-            )
+            doctype = DocType(self.filters.doc_type)
+            query = frappe.qb.from_(doctype).where(self.get_header_conditions(doctype))
 
             # entity name map
-            self.entity_names = {}
-            for d in self.entries:
-                self.entity_names.setdefault(d.entity, d.get("entity_name"))
+            for entries in self.fetch_entries(
+                query,
+                {"entity": doctype.supplier, "entity_name": doctype.supplier_name},
+                self.get_measure_columns(doctype, value_field, qty_field),
+                doctype[self.date_field],
+            ):
+                for d in entries:
+                    self.entity_names.setdefault(d.entity, d.get("entity_name"))
+                self.add_periodic_data(entries)
 
             return
 
         # Customer path (tree_type == "Customer")
         if self.filters.tree_type == "Customer":
-            if self.filters["value_quantity"] == "Value":
-                value_field_doc = "base_net_total"
-            else:
-                value_field_doc = "total_qty"
-
-            doctype = DocType(self.filters.doc_type)
+            doctype = self.get_header_table()
             customer = DocType("Customer")
 
-            entries = (
+            query = (
                 frappe.qb.from_(doctype)
                 .join(customer)
                 .on(doctype.customer == customer.name)
-                .select(
-                    doctype.customer.as_("customer"),
-                    customer.customer_name.as_("customer_name"),
-                    customer.custom_sub_group.as_("custom_sub_group"),
-                    doctype[value_field_doc].as_("value_field"),
-                    doctype[self.date_field],
-                )
-                .where(
-                    (doctype.docstatus == 1)
-                    & (doctype.company.isin(self.filters.company))
-                    & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
-                )
-            ).run(as_dict=True)
+                .where(self.get_header_conditions(doctype, exclude_opening=False))
+            )
+            for entries in self.fetch_entries(
+                query,
+                {
+                    "customer": doctype.customer,
+                    "customer_name": customer.customer_name,
+                    "custom_sub_group": customer.custom_sub_group,
+                },
+                self.get_measure_columns(doctype, value_field, qty_field),
+                self.get_date_column(doctype),
+            ):
+                self.add_customer_entries(entries)
+            return
 
-            self.entries = []
-            self.sub_group_map = {}
-            self.entity_names = {}
+    def add_customer_entries(self, entries):
+        """Fold entries with customer / customer_name / custom_sub_group into the Customer tree"""
+        for e in entries:
+            cust = e.get("customer") or ""
+            cname = e.get("customer_name") or ""
+            sg = e.get("custom_sub_group") or None
 
-            for e in entries:
-                cust = e.get("customer") or ""
-                cname = e.get("customer_name") or ""
-                sg = e.get("custom_sub_group") or None
+            # save customer display name
+            if cust:
+                self.entity_names.setdefault(cust, cname)
 
-                # save customer display name
-                if cust:
-                    self.entity_names.setdefault(cust, cname)
+            if sg:
+                node = f"{cust}::SUB::{sg}"
+                self.sub_group_map.setdefault(cust, set()).add(sg)
+            else:
+                node = cust
 
-                if sg:
-                    node = f"{cust}::SUB::{sg}"
-                    self.sub_group_map.setdefault(cust, set()).add(sg)
-                else:
-                    node = cust
-
-                self.entries.append(
-                    {
-                        "entity": node,
-                        "value_field": e.get("value_field") or 0.0,
-                        self.date_field: e.get(self.date_field),
-                    }
-                )
+            # the chunk is folded right away, so the row is re-keyed in place
+            e["entity"] = node
 
-            # Ordered customer list (for stable output)
-            self.customer_list = frappe.db.get_all(
-                "Customer",
-                filters={"name": ["in", list(self.entity_names.keys())]},
-                fields=["name", "customer_name"],
-                order_by="name",
-            )
-            return
+        self.add_periodic_data(entries)
 
     def get_sales_transactions_based_on_items(self):
-        if self.filters["value_quantity"] == "Value":
-            value_field = "base_net_amount"
-        else:
-            value_field = "stock_qty"
+        value_field = "base_net_amount"
+        qty_field = "stock_qty"
 
-        doctype = DocType(self.filters.doc_type)
-        doctype_item = DocType(f"{self.filters.doc_type} Item")
-
-        self.entries = (
-            frappe.qb.from_(doctype_item)
-            .join(doctype)
-            .on(doctype.name == doctype_item.parent)
-            .select(
-                doctype_item.item_code.as_("entity"),
-                doctype_item.item_name.as_("entity_name"),
-                doctype_item.stock_uom,
-                doctype_item[value_field].as_("value_field"),
-                doctype[self.date_field],
-            )
-            .where(
-                (doctype_item.docstatus == 1)
-                & (doctype.company.isin(self.filters.company))
-                & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
-            )
-        ).run(as_dict=True)
+        query, doctype, doctype_item = self.get_item_query()
 
-        self.entity_names = {}
-        for d in self.entries:
-            self.entity_names.setdefault(d.entity, d.entity_name)
+        if self.use_fact_table:
+            # facts keep only the item code; names and UOM come from the Item master
+            item = DocType("Item")
+            query = query.left_join(item).on(item.name == doctype_item.item_code)
+            attributes = {"entity_name": item.item_name, "stock_uom": item.stock_uom}
+        else:
+            attributes = {"entity_name": doctype_item.item_name, "stock_uom": doctype_item.stock_uom}
+
+        for entries in self.fetch_entries(
+            query,
+            {"entity": doctype_item.item_code},
+            self.get_measure_columns(doctype_item, value_field, qty_field),
+            self.get_date_column(doctype),
+            attributes=attributes,
+        ):
+            for d in entries:
+                self.entity_names.setdefault(d.entity, d.entity_name)
+            self.add_periodic_data(entries)
 
     # ----------------------------------------------------------------------
     # CUSTOMER GROUP / TERRITORY / SUPPLIER GROUP LOGIC
@@ -320,262 +884,452 @@ class Analytics:
         Customer Group -> Sub Group -> Customer
         """
 
-        if self.filters["value_quantity"] == "Value":
-            value_field_expr = "base_net_total"
-        else:
-            value_field_expr = "total_qty"
+        value_field_expr = "base_net_total"
+        qty_field = "total_qty"
 
         # ---------------- CUSTOMER GROUP (with subgroup + customer) ---------------
         if self.filters.tree_type == "Customer Group":
-            doctype = DocType(self.filters.doc_type)
+            doctype = self.get_header_table()
             customer = DocType("Customer")
 
-            entries = (
+            query = (
                 frappe.qb.from_(doctype)
                 .join(customer)
                 .on(doctype.customer == customer.name)
-                .select(
-                    customer.customer_group.as_("entity_group"),
-                    customer.custom_sub_group.as_("custom_sub_group"),
-                    customer.name.as_("customer"),
-                    customer.customer_name.as_("customer_name"),
-                    doctype[value_field_expr].as_("value_field"),
-                    doctype[self.date_field],
-                )
-                .where(
-                    (doctype.docstatus == 1)
-                    & (doctype.company.isin(self.filters.company))
-                    & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
-                )
-            ).run(as_dict=True)
-
-            # normalised structures
-            self.entries = []
-            self.sub_group_map = {}
-            self.customer_map = {}      # key: subgroup node, value: set(customer)
-            self.customer_labels = {}   # key: customer, value: "CUST-001 - Name"
-
-            for e in entries:
-                grp = e.get("entity_group") or ""
-                sg = e.get("custom_sub_group") or None
-                cust = e.get("customer")
-                cname = e.get("customer_name") or ""
-
-                # determine node (group or group::SUB::subgroup)
-                if sg:
-                    node = f"{grp}::SUB::{sg}"
-                    self.sub_group_map.setdefault(grp, set()).add(sg)
-                else:
-                    node = grp
-
-                # store row
-                self.entries.append(
-                    {
-                        "entity": node,
-                        "customer": cust,
-                        "customer_name": cname,
-                        self.date_field: e.get(self.date_field),
-                        "value_field": e.get("value_field") or 0.0,
-                    }
-                )
-
-                # customer per subgroup node
-                if cust:
-                    self.customer_map.setdefault(node, set()).add(cust)
-                    # label: CUST-001 – Alfa Traders Pvt Ltd
-                    label = cust
-                    if cname:
-                        label = f"{cust} - {cname}"
-                    self.customer_labels[cust] = label
-
-            # load all groups / depth_map
-            self.get_groups()
+                .where(self.get_header_conditions(doctype, exclude_opening=False))
+            )
+            for entries in self.fetch_entries(
+                query,
+                {
+                    "customer_group": customer.customer_group,
+                    "custom_sub_group": customer.custom_sub_group,
+                    "customer": customer.name,
+                    "customer_name": customer.customer_name,
+                },
+                self.get_measure_columns(doctype, value_field_expr, qty_field),
+                self.get_date_column(doctype),
+            ):
+                self.add_customer_group_entries(entries)
             return
 
         # ---------------- OTHER TREE TYPES (original behaviour) ---------------
+        doctype = self.get_header_table()
+        query = frappe.qb.from_(doctype).where(self.get_header_conditions(doctype))
+
         if self.filters.tree_type == "Supplier Group":
-            entity_field = "supplier as entity"
-            self.get_supplier_parent_child_map()
+            # resolve the group in the query, so only suppliers with transactions are read
+            supplier = DocType("Supplier")
+            query = query.join(supplier).on(doctype.supplier == supplier.name)
+            entity_field = supplier.supplier_group
         else:
-            entity_field = "territory as entity"
+            entity_field = doctype.territory
 
-        filters = {
-            "docstatus": 1,
-            "company": ["in", self.filters.company],
-            self.date_field: ("between", [self.filters.from_date, self.filters.to_date]),
-        }
+        for entries in self.fetch_entries(
+            query,
+            {"entity": entity_field},
+            self.get_measure_columns(doctype, value_field_expr, qty_field),
+            self.get_date_column(doctype),
+        ):
+            self.add_periodic_data(entries)
+
+    def add_customer_group_entries(self, entries):
+        """Fold entries with customer_group / custom_sub_group / customer into the Customer Group tree"""
+        for e in entries:
+            grp = e.get("customer_group") or ""
+            sg = e.get("custom_sub_group") or None
+            cust = e.get("customer")
+            cname = e.get("customer_name") or ""
+
+            # determine node (group or group::SUB::subgroup)
+            if sg:
+                node = f"{grp}::SUB::{sg}"
+                self.sub_group_map.setdefault(grp, set()).add(sg)
+            else:
+                node = grp
 
-        if self.filters.doc_type in ["Sales Invoice", "Purchase Invoice", "Payment Entry"]:
-            filters.update({"is_opening": "No"})
+            e["entity"] = node
 
-        self.entries = frappe.get_all(
-            self.filters.doc_type,
-            fields=[entity_field, f"{value_field_expr} as value_field", self.date_field],
-            filters=filters,
-        )
-        self.get_groups()
+            # customer per subgroup node
+            if cust:
+                self.customer_map.setdefault(node, set()).add(cust)
+                # label: CUST-001 – Alfa Traders Pvt Ltd
+                label = cust
+                if cname:
+                    label = f"{cust} - {cname}"
+                self.customer_labels[cust] = label
+
+        self.add_periodic_data(entries)
 
     def get_sales_transactions_based_on_item_group(self):
-        if self.filters["value_quantity"] == "Value":
-            value_field = "base_net_amount"
-        else:
-            value_field = "qty"
+        value_field = "base_net_amount"
+        qty_field = "qty"
+
+        query, doctype, doctype_item = self.get_item_query()
+        for entries in self.fetch_entries(
+            query,
+            {"entity": doctype_item.item_group},
+            self.get_measure_columns(doctype_item, value_field, qty_field),
+            self.get_date_column(doctype),
+        ):
+            self.add_periodic_data(entries)
+
+    def get_sales_transactions_based_on_project(self):
+        value_field = "base_net_total"
+        qty_field = "total_qty"
+
+        doctype = self.get_header_table()
+        query = frappe.qb.from_(doctype).where(
+            self.get_header_conditions(doctype) & (IfNull(doctype.project, "") != "")
+        )
+        for entries in self.fetch_entries(
+            query,
+            {"entity": doctype.project},
+            self.get_measure_columns(doctype, value_field, qty_field),
+            self.get_date_column(doctype),
+        ):
+            self.add_periodic_data(entries)
+
+    # ----------------------------------------------------------------------
+    # QUERY HELPERS
+    # ----------------------------------------------------------------------
+
+    def get_header_table(self):
+        """Transaction header table, or the daily fact table when it is in use"""
+        return DocType(FACT_DOCTYPE if self.use_fact_table else self.filters.doc_type)
+
+    def get_item_query(self):
+        """
+        (query, header table, item table) for line-level entries, already filtered
+        on docstatus / company / date. Both tables are the fact table when it is in use.
+        """
+        if self.use_fact_table:
+            fact = DocType(FACT_DOCTYPE)
+            query = frappe.qb.from_(fact).where(self.get_header_conditions(fact, exclude_opening=False))
+            return query, fact, fact
 
         doctype = DocType(self.filters.doc_type)
         doctype_item = DocType(f"{self.filters.doc_type} Item")
-
-        self.entries = (
+        query = (
             frappe.qb.from_(doctype_item)
             .join(doctype)
             .on(doctype.name == doctype_item.parent)
-            .select(
-                doctype_item.item_group.as_("entity"),
-                doctype_item[value_field].as_("value_field"),
-                doctype[self.date_field],
-            )
             .where(
                 (doctype_item.docstatus == 1)
                 & (doctype.company.isin(self.filters.company))
-                & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
+                & self.get_date_condition(doctype[self.date_field])
             )
-        ).run(as_dict=True)
+        )
+        return query, doctype, doctype_item
 
-        self.get_groups()
+    def get_header_conditions(self, doctype, exclude_opening=True):
+        """docstatus / company / date range filter for transaction header queries"""
+        date_column = self.get_date_column(doctype)
 
-    def get_sales_transactions_based_on_project(self):
-        if self.filters["value_quantity"] == "Value":
-            value_field = "base_net_total as value_field"
-        else:
-            value_field = "total_qty as value_field"
+        if self.use_fact_table:
+            # facts only hold submitted documents
+            conditions = (
+                (doctype.doc_type == self.filters.doc_type)
+                & (doctype.company.isin(self.filters.company))
+                & self.get_date_condition(date_column)
+            )
+            if exclude_opening:
+                conditions &= doctype.is_opening == 0
+            return conditions
+
+        conditions = (
+            (doctype.docstatus == 1)
+            & (doctype.company.isin(self.filters.company))
+            & self.get_date_condition(date_column)
+        )
+        if exclude_opening and self.filters.doc_type in ["Sales Invoice", "Purchase Invoice", "Payment Entry"]:
+            conditions &= doctype.is_opening == "No"
+        return conditions
 
-        entity = "project as entity"
+    def get_date_condition(self, date_column):
+        """
+        Report date range, or in comparison mode the report range and the same range a year
+        earlier. The range ends with the last period: a long range gets at most 52 of them
+        (see `get_period_date_ranges`), and a date past them has no column or bucket.
+        """
+        condition = date_column.between(self.filters.from_date, self.periodic_daterange[-1])
+        if self.compare:
+            condition |= date_column.between(self.prior_from_date, self.prior_daterange[-1])
+        return condition
 
-        filters = {
-            "docstatus": 1,
-            "company": ["in", self.filters.company],
-            "project": ["!=", ""],
-            self.date_field: ("between", [self.filters.from_date, self.filters.to_date]),
-        }
+    def get_date_column(self, doctype):
+        return doctype.posting_date if self.use_fact_table else doctype[self.date_field]
 
-        if self.filters.doc_type in ["Sales Invoice", "Purchase Invoice", "Payment Entry"]:
-            filters.update({"is_opening": "No"})
+    def get_value_column(self, doctype, fieldname):
+        """
+        Column holding `fieldname` (base_net_total, total_qty, base_net_amount, stock_qty, qty).
+        Facts are kept per line, so header totals map to the summed line measure.
+        """
+        if self.use_fact_table:
+            return doctype[FACT_MEASURES.get(fieldname, fieldname)]
+        return doctype[fieldname]
 
-        self.entries = frappe.get_all(
-            self.filters.doc_type, fields=[entity, value_field, self.date_field], filters=filters
-        )
+    def get_measure_columns(self, doctype, value_field, qty_field):
+        """alias -> column of each measure in `self.measures`, picked by the Value Or Qty filter"""
+        if self.filters.value_quantity == "Quantity":
+            return {"value_field": self.get_value_column(doctype, qty_field)}
+
+        columns = {"value_field": self.get_value_column(doctype, value_field)}
+        if "qty_field" in self.measures:
+            columns["qty_field"] = self.get_value_column(doctype, qty_field)
+        return columns
+
+    def fetch_entries(self, query, fields, measure_columns, date_column, attributes=None):
+        """
+        Yield the entries of the query in chunks of at most FETCH_CHUNK_ROWS rows.
+
+        The query runs window by window (see `get_fetch_windows`), oldest periods
+        first. Between windows the run checks for cancellation and, when the time
+        budget is spent, stops and keeps only the periods fetched so far. Callers
+        fold each chunk into the matrix before asking for the next one, so memory
+        stays bounded by the chunk size and not by the number of source rows.
+        """
+        windows = self.get_fetch_windows()
+
+        for index, (first_slot, last_slot) in enumerate(windows):
+            self.check_cancelled()
+
+            window_query = query
+            if windows != [(0, len(self.period_index) - 1)]:
+                window = date_column.between(
+                    self.period_index.start_dates[first_slot], self.period_index.end_dates[last_slot]
+                )
+                if self.compare:
+                    window |= date_column.between(
+                        self.prior_index.start_dates[first_slot], self.prior_index.end_dates[last_slot]
+                    )
+                window_query = query.where(window)
+
+            with self.get_entry_cursor():
+                rows = self.run_entry_query(window_query, fields, measure_columns, date_column, attributes)
+                while chunk := list(islice(rows, FETCH_CHUNK_ROWS)):
+                    yield chunk
+
+            if index < len(windows) - 1 and self.is_over_budget():
+                self.truncate_periods(last_slot + 1)
+                break
+
+    def get_entry_cursor(self):
+        """
+        Unbuffered cursor for the entry query where the database supports it, so rows
+        stream from the server instead of being materialised by the driver first.
+        No other query may run on the connection while it is open.
+        """
+        unbuffered_cursor = getattr(frappe.db, "unbuffered_cursor", None)
+        return unbuffered_cursor() if unbuffered_cursor else nullcontext()
+
+    def run_entry_query(self, query, fields, measure_columns, date_column, attributes=None):
+        """
+        Iterator over `fields` (alias -> column), the measures and the posting date from `query`.
+
+        With aggregate_in_db the database sums the measures per entity and period bucket,
+        so one row comes back per entity x period instead of one per transaction. The
+        bucket is replaced by its period end date, which falls in the same column slot
+        as any date inside it. `attributes` are reduced with MAX() in that mode.
+        """
+        attributes = attributes or {}
+
+        if not self.aggregate_in_db:
+            columns = [column.as_(alias) for alias, column in {**fields, **attributes}.items()]
+            yield from query.select(
+                *columns,
+                *[column.as_(alias) for alias, column in measure_columns.items()],
+                date_column.as_(self.date_field),
+            ).run(as_dict=True, as_iterator=True)
+            return
+
+        bucket_end_dates = self.get_bucket_end_dates()
+        bucket = self.get_period_bucket(date_column, bucket_end_dates)
+        entries = (
+            query.select(
+                *[column.as_(alias) for alias, column in fields.items()],
+                *[Max(column).as_(alias) for alias, column in attributes.items()],
+                *[Sum(column).as_(alias) for alias, column in measure_columns.items()],
+                bucket.as_("period_slot"),
+            ).groupby(*fields.values(), bucket)
+        ).run(as_dict=True, as_iterator=True)
+
+        for d in entries:
+            d[self.date_field] = bucket_end_dates[d.pop("period_slot")]
+            yield d
+
+    # ----------------------------------------------------------------------
+    # TIME BUDGET / CANCELLATION
+    # ----------------------------------------------------------------------
+
+    def get_fetch_windows(self):
+        """
+        (first_slot, last_slot) ranges the entry query is split into: the runs of
+        periods missing from the period cache. A run without a time budget, or one
+        known to be small, fetches each run of periods at once.
+        """
+        period_count = len(self.period_index)
+        runs = []
+        for slot in range(period_count):
+            if slot in self.cached_periods:
+                continue
+            if runs and runs[-1][1] == slot - 1:
+                runs[-1][1] = slot
+            else:
+                runs.append([slot, slot])
+
+        if not self.time_budget or (self.estimated_rows is not None and self.estimated_rows <= SMALL_RUN_ROWS):
+            return [tuple(run) for run in runs]
+
+        size = -(-period_count // FETCH_WINDOWS)
+        return [
+            (first, min(first + size - 1, last))
+            for run_first, last in runs
+            for first in range(run_first, last + 1, size)
+        ]
+
+    def is_over_budget(self):
+        return bool(self.time_budget) and time.monotonic() - self.started_at > self.time_budget
+
+    def truncate_periods(self, period_count):
+        """Drop the periods that were not fetched and flag the result as partial"""
+        self.partial = True
+        self.period_index = self.period_index.truncated(period_count)
+        if self.compare:
+            self.prior_index = self.prior_index.truncated(period_count)
+        self.periodic_daterange = self.periodic_daterange[:period_count]
+        self.matrix.truncate(period_count)
+        self.get_columns()
+
+    def check_cancelled(self):
+        """Stop a queued run once the user has cancelled it from the report"""
+        job_key = getattr(self, "job_key", None)
+        if job_key and frappe.cache.get_value(f"{CANCEL_KEY}:{job_key}"):
+            raise AnalyticsRunCancelled(_("The report run was cancelled"))
+
+    def get_bucket_end_dates(self):
+        """Period end dates the aggregated query buckets by, prior periods first in comparison mode"""
+        if self.compare:
+            return self.prior_index.end_dates + self.periodic_daterange
+        return self.periodic_daterange
+
+    def get_period_bucket(self, date_column, end_dates):
+        """CASE expression mapping a date to its index in `end_dates`"""
+        bucket = Case()
+        for slot, end_date in enumerate(end_dates):
+            bucket = bucket.when(date_column <= end_date, slot)
+        return bucket
 
     # ----------------------------------------------------------------------
     # ROW BUILDING
     # ----------------------------------------------------------------------
 
-    def get_rows_for_customer_or_supplier(self):
+    def iter_rows_for_customer_or_supplier(self):
         """
         Handles Customer tree_type (with subgroups) and Supplier standard behaviour.
         """
-        self.get_periodic_data()
-        data = []
-
         # Customer tree: parent is Customer, child is its subgroups
         if self.filters.tree_type == "Customer":
-            # iterate customers in deterministic order
-            if hasattr(self, "customer_list") and self.customer_list:
-                customer_iter = self.customer_list
-            else:
-                customer_iter = [
-                    {"name": k, "customer_name": self.entity_names.get(k)}
-                    for k in sorted(self.entity_names.keys())
-                ]
-
-            for c in customer_iter:
-                cust = c.get("name")
-                cname = c.get("customer_name")
+            # iterate customers in deterministic order, from the names the join
+            # already returned instead of a second lookup with an IN list of every
+            # customer; casefold follows the case-insensitive order of the DB
+            for cust in sorted(self.entity_names, key=str.casefold):
+                cname = self.entity_names[cust]
 
                 # parent customer row
-                row = {"entity": cust, "entity_name": cname}
-                total = 0.0
-                for end_date in self.periodic_daterange:
-                    period = self.get_period(end_date)
-                    amount = flt(self.entity_periodic_data.get(cust, {}).get(period, 0.0))
-                    row[scrub(period)] = amount
-                    total += amount
-                row["total"] = total
-                data.append(row)
+                yield self.set_period_values({"entity": cust, "entity_name": cname}, self.matrix.get(cust))
 
                 # subgroups
                 subgroups = sorted(list(self.sub_group_map.get(cust, []))) if hasattr(self, "sub_group_map") else []
                 for sg in subgroups:
                     node = f"{cust}::SUB::{sg}"
-                    row_sg = {"entity": node, "entity_name": None, "indent": 1}
-                    total_sg = 0.0
-                    for end_date in self.periodic_daterange:
-                        period = self.get_period(end_date)
-                        val = flt(self.entity_periodic_data.get(node, {}).get(period, 0.0))
-                        row_sg[scrub(period)] = val
-                        total_sg += val
-                    row_sg["total"] = total_sg
-                    data.append(row_sg)
-
-            self.data = data
+                    yield self.set_period_values(
+                        {"entity": node, "entity_name": None, "indent": 1}, self.matrix.get(node)
+                    )
             return
 
         # Supplier tree (simple list)
-        self.get_rows()
-
-    def get_rows(self):
-        self.data = []
-        self.get_periodic_data()
+        yield from self.iter_entity_rows()
 
-        for entity, period_data in self.entity_periodic_data.items():
+    def iter_entity_rows(self):
+        indexes, others = self.select_rows()
+        for index in indexes:
+            entity = self.matrix.entities[index]
             row = {
                 "entity": entity,
                 "entity_name": self.entity_names.get(entity) if hasattr(self, "entity_names") else None,
             }
-            total = 0
-            for end_date in self.periodic_daterange:
-                period = self.get_period(end_date)
-                amount = flt(period_data.get(period, 0.0))
-                row[scrub(period)] = amount
-                total += amount
-
-            row["total"] = total
+            self.set_period_values(row, self.matrix.values[index])
 
             if self.filters.tree_type == "Item":
-                row["stock_uom"] = period_data.get("stock_uom")
+                row["stock_uom"] = self.stock_uom_map.get(entity)
 
-            self.data.append(row)
+            yield row
 
-    def get_rows_by_group(self):
-        # Build periodic data first
-        self.get_periodic_data()
+        if others is not None:
+            count, values = others
+            others_label, count_label = self.others_labels
+            yield self.set_period_values({"entity": others_label, "entity_name": count_label.format(count)}, values)
 
-        # For Customer Group tree, roll up subgroup totals into parent groups
-        if self.filters.tree_type == "Customer Group":
-            self.rollup_subgroups_to_parent()
+    def select_rows(self):
+        """
+        (matrix row indexes to show, (count, values) of the rest or None).
+
+        Unpaged runs keep every entity in first-seen order, up to `row_limit`.
+        With top_n, sort_by_total, start / page_length or the after_total /
+        after_entity keyset, rows are ordered by total (first measure, descending),
+        then entity. Only the page is picked, with a heap of its size. All other
+        rows are summed into one "Others" row, so the grand totals stay correct.
+        """
+        count = len(self.matrix)
+        top_n = cint(self.filters.get("top_n"))
+        start = cint(self.filters.get("start"))
+        page_length = cint(self.filters.get("page_length")) or top_n
+        keyset = self.filters.get("after_entity") not in (None, "")
+
+        if not (top_n or page_length or start or keyset or cint(self.filters.get("sort_by_total"))):
+            if self.row_limit is None or count <= self.row_limit:
+                return range(count), None
+            page_length = self.row_limit
+
+        page_length = page_length or count
+        totals = self.matrix.row_totals()[:, 0]
+        entities = self.matrix.entities
+        candidates = range(count)
+
+        if keyset:
+            # rows after (after_total, after_entity) in (total desc, entity asc) order
+            after_total, after_entity = flt(self.filters.get("after_total")), self.filters.after_entity
+            candidates = [
+                index
+                for index in candidates
+                if totals[index] < after_total or (totals[index] == after_total and entities[index] > after_entity)
+            ]
+            start = 0
+
+        indexes = heapq.nsmallest(
+            start + page_length, candidates, key=lambda index: (-totals[index], entities[index])
+        )[start:]
+
+        if len(indexes) == count:
+            return indexes, None
+
+        shown = self.matrix.values[indexes].sum(axis=0) if indexes else 0
+        return indexes, (count - len(indexes), self.matrix.values[:count].sum(axis=0) - shown)
+
+    def iter_rows_by_group(self):
+        with report_phase("roll-up"):
+            # For Customer Group tree, roll up subgroup totals into parent groups
+            if self.filters.tree_type == "Customer Group":
+                self.rollup_subgroups_to_parent()
 
-        out = []
+            # group_entries are ordered by lft, i.e. parents come before their descendants
+            subtree_totals = self.get_group_subtree_totals()
 
-        # IMPORTANT: iterate from leaves to root so that parent totals include children
-        for d in reversed(self.group_entries):
+        for d, values in zip(self.group_entries, subtree_totals, strict=True):
             gname = d.name
-            block = []  # rows that belong to this group (group + subgroups + customers)
 
             # ---------------- GROUP ROW ----------------
-            row = {"entity": gname, "indent": self.depth_map.get(gname)}
-            total = 0.0
-            for end_date in self.periodic_daterange:
-                period = self.get_period(end_date)
-                amount = flt(self.entity_periodic_data.get(gname, {}).get(period, 0.0))
-                row[scrub(period)] = amount
-
-                # aggregate value into parent (original behaviour)
-                if d.parent and (self.filters.tree_type != "Order Type" or d.parent == "Order Types"):
-                    self.entity_periodic_data.setdefault(d.parent, frappe._dict()).setdefault(period, 0.0)
-                    self.entity_periodic_data[d.parent][period] += amount
-
-                total += amount
-
-            row["total"] = total
-            block.append(row)
+            yield self.set_period_values({"entity": gname, "indent": self.depth_map.get(gname)}, values)
 
             # ---------------- CUSTOMER GROUP SPECIAL: SUBGROUP + CUSTOMER ROWS -------------
             if self.filters.tree_type == "Customer Group":
@@ -585,15 +1339,7 @@ class Analytics:
                 subgroups = sorted(list(self.sub_group_map.get(gname, []))) if hasattr(self, "sub_group_map") else []
                 for sg in subgroups:
                     node = f"{gname}::SUB::{sg}"
-                    row_sg = {"entity": node, "indent": base_indent + 1}
-                    total_sg = 0.0
-                    for end_date in self.periodic_daterange:
-                        period = self.get_period(end_date)
-                        val = flt(self.entity_periodic_data.get(node, {}).get(period, 0.0))
-                        row_sg[scrub(period)] = val
-                        total_sg += val
-                    row_sg["total"] = total_sg
-                    block.append(row_sg)
+                    yield self.set_period_values({"entity": node, "indent": base_indent + 1}, self.matrix.get(node))
 
                     # CUSTOMER rows under this subgroup
                     customers = (
@@ -605,58 +1351,129 @@ class Analytics:
                         label = self.customer_labels.get(cust, cust)
                         row_c = {
                             "entity": label,  # "CUST-001 - Alfa Traders Pvt Ltd"
+                            # not a column: the id the drill-down filters on, the label may not split back into it
+                            "customer": cust,
                             "indent": base_indent + 2,
                         }
-                        total_c = 0.0
-                        for end_date in self.periodic_daterange:
-                            period = self.get_period(end_date)
-                            v = flt(self.entity_periodic_data.get(cust, {}).get(period, 0.0))
-                            row_c[scrub(period)] = v
-                            total_c += v
-                        row_c["total"] = total_c
-                        block.append(row_c)
+                        yield self.set_period_values(row_c, self.matrix.get(cust))
+
+    def get_group_subtree_totals(self):
+        """
+        Period values of every group including all of its descendants, aligned
+        with `group_entries`, rolled up in one pass over the lft/rgt nested set.
+        """
+        own_values = np.zeros((len(self.group_entries), self.matrix.width))
+        for index, d in enumerate(self.group_entries):
+            if d.name in self.matrix:
+                own_values[index] = self.matrix.get(d.name)
+
+        totals, _depths = rollup_nested_set(
+            own_values,
+            [cint(d.lft) for d in self.group_entries],
+            [cint(d.rgt) for d in self.group_entries],
+        )
+        return totals
+
+    def set_period_values(self, row, values):
+        """Fill the period columns and the totals of `row` from a period vector"""
+        cells = values.reshape(-1, self.matrix.measures)
+        row.update(zip(self.cell_fieldnames, self.expand_cells(cells).ravel().tolist(), strict=True))
+        row.update(
+            zip(
+                self.total_fieldnames,
+                self.expand_cells(cells.sum(axis=0, keepdims=True)).ravel().tolist(),
+                strict=True,
+            )
+        )
+        return row
 
-            # prepend this block so that parent appears above all its descendants
-            out = block + out
+    def expand_cells(self, cells):
+        """
+        Cells of each period (one row of matrix columns per period) in column order.
+        In comparison mode every measure becomes (this year, last year, change, growth %),
+        computed for all periods at once.
+        """
+        if not self.compare:
+            return cells
 
-        self.data = out
+        count = len(self.measures)
+        current, prior = cells[:, :count], cells[:, count:]
+        delta = current - prior
+        growth = np.divide(delta * 100, np.abs(prior), out=np.zeros_like(delta), where=prior != 0)
+        return np.stack([current, prior, delta, growth], axis=2)
 
     # ----------------------------------------------------------------------
     # PERIODIC DATA
     # ----------------------------------------------------------------------
 
-    def get_periodic_data(self):
-        self.entity_periodic_data = frappe._dict()
-
-        for d in self.entries:
-            # Supplier Group mapping
-            if self.filters.tree_type == "Supplier Group":
-                d["entity"] = self.parent_child_map.get(d.get("entity"))
+    def init_periodic_data(self):
+        # lookups filled while fetching
+        self.entity_names = {}
+        self.sub_group_map = {}     # key: customer or group, value: set(sub group)
+        self.customer_map = {}      # key: subgroup node, value: set(customer)
+        self.customer_labels = {}   # key: customer, value: "CUST-001 - Name"
+        # comparison mode keeps each measure of last year next to this year's in the same slot
+        self.matrix = EntityPeriodMatrix(
+            len(self.period_index), measures=len(self.measures) * (2 if self.compare else 1)
+        )
+        self.stock_uom_map = {}
 
+    def add_periodic_data(self, entries):
+        """Fold one chunk of entries into the entity x period matrix with a single vectorized add"""
+        entities, slots, amounts = [], [], []
+        padding = [0.0] * len(self.measures)
+        for d in entries:
             entity = d.get("entity")
             if not entity:
                 continue
 
-            raw_date = d.get(self.date_field)
-            if not raw_date:
+            slot, prior = self.get_entry_slot(d.get(self.date_field))
+            if slot is None:
                 continue
 
-            period = self.get_period(raw_date)
+            amount = [flt(d.get(measure) or 0.0) for measure in self.measures]
+            if self.compare:
+                amount = padding + amount if prior else amount + padding
 
             # base entity (group / subgroup / item / customer / project etc.)
-            self.entity_periodic_data.setdefault(entity, frappe._dict()).setdefault(period, 0.0)
-            self.entity_periodic_data[entity][period] += flt(d.get("value_field") or 0.0)
+            entities.append(entity)
+            slots.append(slot)
+            amounts.append(amount)
 
             # ITEM extra data
             if self.filters.tree_type == "Item":
-                self.entity_periodic_data[entity]["stock_uom"] = d.get("stock_uom")
+                self.stock_uom_map[entity] = d.get("stock_uom")
 
             # CUSTOMER GROUP: maintain customer-level totals for 3rd level
             if self.filters.tree_type == "Customer Group":
                 cust = d.get("customer")
                 if cust:
-                    self.entity_periodic_data.setdefault(cust, frappe._dict()).setdefault(period, 0.0)
-                    self.entity_periodic_data[cust][period] += flt(d.get("value_field") or 0.0)
+                    entities.append(cust)
+                    slots.append(slot)
+                    amounts.append(amount)
+
+        self.matrix.add(entities, slots, amounts)
+
+    def get_entry_slot(self, date):
+        """(slot, is last year) of an entry date; slot is None outside the report"""
+        prior = bool(self.compare and date and date <= self.prior_to_date)
+        return (self.prior_index if prior else self.period_index).get_slot(date), prior
+
+    def get_changed_fieldnames(self, dates):
+        """Cell fieldnames of the periods `dates` fall in, followed by the totals"""
+        cells_per_period = len(self.cell_fieldnames) // len(self.period_index)
+        slots = sorted({self.get_entry_slot(date)[0] for date in dates} - {None})
+        return [
+            fieldname
+            for slot in slots
+            for fieldname in self.cell_fieldnames[slot * cells_per_period : (slot + 1) * cells_per_period]
+        ] + self.total_fieldnames
+
+    def finish_periodic_data(self):
+        """Called once every chunk has been folded in"""
+        self.publish_progress("bucket")
+        self.check_cancelled()
+        self.publish_progress("roll-up")
 
     # ----------------------------------------------------------------------
     # PERIOD / DATE RANGE
@@ -676,6 +1493,20 @@ class Analytics:
             period = str(year[0])
         return period
 
+    def build_period_index(self):
+        """
+        Label every period once. Must run after the company list is expanded,
+        since Yearly labels come from the fiscal year of the first company.
+        """
+        self.period_index = PeriodIndex(
+            self.period_start_date,
+            self.periodic_daterange,
+            [self.get_period(end_date) for end_date in self.periodic_daterange],
+        )
+        if self.compare:
+            # same slots and labels as this year's periods
+            self.prior_index = PeriodIndex(self.prior_start_date, self.prior_daterange, self.period_index.labels)
+
     def get_period_date_ranges(self):
         from dateutil.relativedelta import MO, relativedelta
 
@@ -690,6 +1521,7 @@ class Analytics:
         else:
             from_date = from_date + relativedelta(from_date, weekday=MO(-1))
 
+        self.period_start_date = from_date
         self.periodic_daterange = []
         for _dummy in range(1, 53):
             if self.filters.range == "Weekly":
@@ -706,92 +1538,126 @@ class Analytics:
             if period_end_date == to_date:
                 break
 
+    def get_prior_date_ranges(self):
+        """
+        The periods of `periodic_daterange` one year earlier; Weekly goes back 52 weeks
+        so weeks still start on Monday. Month ends stay month ends (28 Feb -> 29 Feb).
+        """
+        from_date, to_date = getdate(self.filters.from_date), getdate(self.filters.to_date)
+        if self.get_prior_date(to_date) >= from_date:
+            frappe.throw(_("Comparison with the previous year needs a date range shorter than a year"))
+
+        self.prior_from_date = self.get_prior_date(from_date)
+        self.prior_to_date = self.get_prior_date(to_date)
+        self.prior_start_date = self.get_prior_date(self.period_start_date)
+        self.prior_daterange = [self.get_prior_date(end_date) for end_date in self.periodic_daterange]
+        # results that read last year must be invalidated by changes there too
+        self.filters.scan_from_date = self.prior_from_date
+
+    def get_prior_date(self, date):
+        if self.filters.range == "Weekly":
+            return add_days(date, -364)
+
+        prior_date = getdate(add_to_date(date, years=-1))
+        if date == getdate(get_last_day(date)):
+            return getdate(get_last_day(prior_date))
+        return prior_date
+
     # ----------------------------------------------------------------------
     # GROUP & TREE HELPERS
     # ----------------------------------------------------------------------
 
     def get_groups(self):
-        if self.filters.tree_type == "Territory":
-            parent = "parent_territory"
-        if self.filters.tree_type == "Customer Group":
-            parent = "parent_customer_group"
-        if self.filters.tree_type == "Item Group":
-            parent = "parent_item_group"
-        if self.filters.tree_type == "Supplier Group":
-            parent = "parent_supplier_group"
-
-        self.depth_map = frappe._dict()
-
-        self.group_entries = frappe.db.sql(
-            f"""select name, lft, rgt , {parent} as parent
-            from `tab{self.filters.tree_type}` order by lft""",
-            as_dict=1,
-        )
-
-        for d in self.group_entries:
-            if d.parent:
-                self.depth_map.setdefault(d.name, self.depth_map.get(d.parent) + 1)
-            else:
-                self.depth_map.setdefault(d.name, 0)
+        self.group_entries, self.depth_map = get_group_tree(self.filters.tree_type)
 
     def get_teams(self):
-        self.depth_map = frappe._dict()
-
-        self.group_entries = frappe.db.sql(
-            f""" select * from (select "Order Types" as name, 0 as lft,
-            2 as rgt, '' as parent union select distinct order_type as name, 1 as lft, 1 as rgt, "Order Types" as parent
-            from `tab{self.filters.doc_type}` where ifnull(order_type, '') != '') as b order by lft, name
-        """,
-            as_dict=1,
-        )
-
-        for d in self.group_entries:
-            if d.parent:
-                self.depth_map.setdefault(d.name, self.depth_map.get(d.parent) + 1)
-            else:
-                self.depth_map.setdefault(d.name, 0)
-
-    def get_supplier_parent_child_map(self):
-        self.parent_child_map = frappe._dict(
-            frappe.db.sql(""" select name, supplier_group from `tabSupplier`""")
-        )
+        self.group_entries, self.depth_map = get_order_type_tree(self.filters.doc_type)
 
     def rollup_subgroups_to_parent(self):
         """
-        After entity_periodic_data is built, roll-up subgroup values into their parent.
+        After the matrix is built, roll-up subgroup values into their parent.
         Subgroup node names follow the pattern: "<Parent>::SUB::<SubGroup>"
         """
         if not hasattr(self, "sub_group_map"):
             return
 
         for parent, sgs in self.sub_group_map.items():
-            self.entity_periodic_data.setdefault(parent, frappe._dict())
             for sg in sgs:
-                node = f"{parent}::SUB::{sg}"
-                for d in self.periodic_daterange:
-                    lbl = self.get_period(d)
-                    val = flt(self.entity_periodic_data.get(node, {}).get(lbl, 0.0))
-                    self.entity_periodic_data[parent].setdefault(lbl, 0.0)
-                    self.entity_periodic_data[parent][lbl] += val
-                    self.entity_periodic_data[parent].setdefault("total", 0.0)
-                    self.entity_periodic_data[parent]["total"] += val
+                self.matrix.add_row(parent, f"{parent}::SUB::{sg}")
 
     # ----------------------------------------------------------------------
     # CHART
     # ----------------------------------------------------------------------
 
     def get_chart_data(self):
-        length = len(self.columns)
+        """
+        One line per top row (the `chart_top_n` largest by total, default
+        DEFAULT_CHART_TOP_N) and a total line, plus last year's total in comparison
+        mode, all read from the matrix. `series` holds every measure of each line
+        for the Value / Qty switch; other rows are fetched on demand (see chart.py).
+        """
+        labels = [_(period) for period in self.period_index.labels]
+        count = len(self.measures)
+
+        def get_measure_values(vector, offset=0):
+            cells = vector.reshape(-1, self.matrix.measures)
+            return [cells[:, offset + measure] for measure in range(count)]
+
+        names, vectors, total = self.get_chart_rows()
+        series = {name: get_measure_values(vector) for name, vector in zip(names, vectors, strict=True)}
+        series[_("Total")] = get_measure_values(total)
+        if self.compare:
+            series[_("Total (Last Year)")] = get_measure_values(total, offset=count)
+
+        max_points = cint(self.filters.get("chart_max_points"))
+        series = {
+            name: [downsample(values, max_points).tolist() for values in measure_values]
+            for name, measure_values in series.items()
+        }
 
-        if self.filters.tree_type in ["Customer", "Supplier"]:
-            labels = [d.get("label") for d in self.columns[2 : length - 1]]
-        elif self.filters.tree_type == "Item":
-            labels = [d.get("label") for d in self.columns[3 : length - 1]]
-        else:
-            labels = [d.get("label") for d in self.columns[1 : length - 1]]
-        self.chart = {"data": {"labels": labels, "datasets": []}, "type": "line"}
+        self.chart = {
+            "data": {
+                "labels": downsample_labels(labels, max_points),
+                "datasets": [{"name": name, "values": values[0]} for name, values in series.items()],
+            },
+            "type": "line",
+            "series": series,
+        }
 
-        if self.filters["value_quantity"] == "Value":
+        if self.filters["value_quantity"] in ("Value", VALUE_AND_QUANTITY):
             self.chart["fieldtype"] = "Currency"
         else:
             self.chart["fieldtype"] = "Float"
+
+    def get_chart_rows(self):
+        """
+        (names, period vectors) of the top rows by total, and the period vector of
+        the grand total. Group trees chart the children of their root(s).
+        """
+        top_n = DEFAULT_CHART_TOP_N
+        if self.filters.get("chart_top_n") not in (None, ""):
+            top_n = cint(self.filters.chart_top_n)
+
+        if getattr(self, "group_entries", None) is not None:
+            subtree_totals = self.get_group_subtree_totals()
+            depths = [cint(self.depth_map.get(d.name)) for d in self.group_entries]
+            total = sum(
+                (values for values, depth in zip(subtree_totals, depths, strict=True) if depth == 0),
+                np.zeros(self.matrix.width),
+            )
+            candidates = [
+                (values[0 : self.matrix.width : self.matrix.measures].sum(), d.name, values)
+                for d, values, depth in zip(self.group_entries, subtree_totals, depths, strict=True)
+                if depth == 1
+            ]
+        else:
+            total = self.matrix.column_totals() if len(self.matrix) else np.zeros(self.matrix.width)
+            candidates = [
+                (row_total, entity, self.matrix.values[index])
+                for index, (entity, row_total) in enumerate(
+                    zip(self.matrix.entities, self.matrix.row_totals()[:, 0], strict=True)
+                )
+            ]
+
+        top = heapq.nlargest(top_n, candidates, key=lambda candidate: (candidate[0], candidate[1]))
+        return [name for _total, name, _values in top], [values for _total, _name, values in top], total
@@ -0,0 +1,188 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+"""
+Delta refresh of Custom Sales Analytic Report.
+
+Every submission or cancellation of a covered document is appended to a
+change log in Redis under an increasing sequence number. A run returns the
+sequence number it started at as its version token, and keeps a snapshot of
+its rows under that token.
+
+A client that sends its token back gets:
+- nothing when no logged change touches its selection;
+- otherwise the cells of the changed periods, and of the totals, that differ
+  from the snapshot. The new grid is computed with the period cache, so
+  untouched closed periods are not queried again.
+
+It gets a full refresh when the log or the snapshot no longer reaches back to
+its token, or when the row layout changed.
+"""
+
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate
+
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.result_cache import (
+    get_cache_key,
+    get_cache_meta,
+)
+
+REPORT_NAME = "Custom Sales Analytic Report"
+
+SEQUENCE_KEY = "custom_sales_analytics_change_seq"
+CHANGE_LOG_KEY = "custom_sales_analytics_change_log"
+SNAPSHOT_KEY = "custom_sales_analytics_snapshot"
+
+# changes kept in the log; tokens older than the log get a full refresh
+MAX_CHANGES = 10000
+# same lifetime as a cached result
+EXPIRES_IN_SEC = 6 * 60 * 60
+
+
+# ------------------------------------------------------------------
+# CHANGE LOG
+# ------------------------------------------------------------------
+
+
+def get_version():
+    """Sequence number of the last logged change, the token of a run starting now"""
+    return cint(frappe.cache.get(frappe.cache.make_key(SEQUENCE_KEY)))
+
+
+def record_change(doc_type, company, posting_date):
+    sequence = frappe.cache.incr(frappe.cache.make_key(SEQUENCE_KEY))
+    frappe.cache.rpush(
+        CHANGE_LOG_KEY,
+        json.dumps(
+            {
+                "sequence": sequence,
+                "doc_type": doc_type,
+                "company": company,
+                "posting_date": str(getdate(posting_date)),
+            }
+        ),
+    )
+    frappe.cache.ltrim(CHANGE_LOG_KEY, -MAX_CHANGES, -1)
+
+
+def get_changes_since(version):
+    """Changes logged after `version`, or None when the log no longer reaches back to it"""
+    if version > get_version():
+        # the sequence was reset (e.g. Redis was flushed)
+        return None
+
+    changes = [json.loads(change) for change in frappe.cache.lrange(CHANGE_LOG_KEY, 0, -1)]
+    if changes and min(change["sequence"] for change in changes) > version + 1:
+        return None
+    if not changes and version < get_version():
+        return None
+
+    return [change for change in changes if change["sequence"] > version]
+
+
+def affects(filters, change):
+    """True when `change` lies in the doc type, companies and scanned dates of `filters`"""
+    meta = get_cache_meta(filters)
+    return (
+        change["doc_type"] == meta["doc_type"]
+        and change["company"] in meta["companies"]
+        and meta["scan_from_date"] <= change["posting_date"] <= meta["to_date"]
+    )
+
+
+# ------------------------------------------------------------------
+# SNAPSHOTS
+# ------------------------------------------------------------------
+
+
+def get_snapshot_key(filters):
+    return f"{SNAPSHOT_KEY}:{get_cache_key(get_cache_meta(filters))}"
+
+
+def get_snapshot(filters):
+    """(version, rows) of the last full run with these filters, or None"""
+    return frappe.cache.get_value(get_snapshot_key(filters))
+
+
+def set_snapshot(filters, version, rows):
+    frappe.cache.set_value(get_snapshot_key(filters), (version, rows), expires_in_sec=EXPIRES_IN_SEC)
+
+
+# ------------------------------------------------------------------
+# DELTA
+# ------------------------------------------------------------------
+
+
+@frappe.whitelist()
+def get_report_delta(filters, version):
+    """
+    {"version": token, "cells": [[row index, fieldname, value], ...], "totals": {name: series}}
+    with the cells changed since `version` and the new total lines of the chart, or
+    {"full": 1} when the client has to run the report again
+    """
+    from customvinodreports.vinodreports.report.custom_sales_analytic_report.custom_sales_analytic_report import (
+        Analytics,
+    )
+
+    if not frappe.get_doc("Report", REPORT_NAME).is_permitted():
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+    full_refresh = {"full": 1}
+    version = cint(version)
+    current = get_version()
+
+    # a refresh is never queued: it either patches the grid now or asks for a full run
+    filters = {**frappe.parse_json(filters), "run_in_background": 0}
+    analytics = Analytics(filters)
+    analytics.update_company_list_for_parent_company()
+
+    changes = get_changes_since(version)
+    if changes is None:
+        return full_refresh
+
+    snapshot = get_snapshot(analytics.filters)
+    if not snapshot or snapshot[0] != version:
+        return full_refresh
+    _version, old_rows = snapshot
+
+    changes = [
+        change for change in changes if change["sequence"] <= current and affects(analytics.filters, change)
+    ]
+    if not changes:
+        # nothing up to `current` touched the selection, so the snapshot holds for it too
+        set_snapshot(analytics.filters, current, old_rows)
+        return {"version": current, "cells": []}
+
+    # cells of the periods the changes fall in, and the totals
+    analytics.build_period_index()
+    analytics.get_columns()
+    fieldnames = analytics.get_changed_fieldnames([getdate(change["posting_date"]) for change in changes])
+
+    # closed periods no change touched come from the period cache
+    report = Analytics(filters)
+    _columns, rows, _message, chart = report.run()[:4]
+    if report.partial or not chart or [row.get("entity") for row in rows] != [
+        row.get("entity") for row in old_rows
+    ]:
+        return full_refresh
+
+    set_snapshot(analytics.filters, chart["version"], rows)
+    cells = [
+        [index, fieldname, row.get(fieldname)]
+        for index, (row, old_row) in enumerate(zip(rows, old_rows, strict=True))
+        for fieldname in fieldnames
+        if row.get(fieldname) != old_row.get(fieldname)
+    ]
+    # the total lines also cover rows the grid does not show, the client cannot rebuild them
+    series = chart["series"]
+    totals = {name: series[name] for name in (_("Total"), _("Total (Last Year)")) if name in series}
+    return {"version": chart["version"], "cells": cells, "totals": totals if cells else {}}
+
+
+def record_document_change(doc, method=None):
+    """on_submit / on_cancel / on_update_after_submit of the covered documents, once committed"""
+    date_field = "transaction_date" if doc.doctype == "Sales Order" else "posting_date"
+    frappe.db.after_commit.add(lambda: record_change(doc.doctype, doc.company, doc.get(date_field)))
@@ -0,0 +1,210 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+"""
+Drill-down from one cell of Custom Sales Analytic Report to the documents
+behind it.
+
+The cell is identified by the report filters, the row's entity node and the
+period slot. Periods and the date range come from the same `Analytics`
+instance a run would use, and the measure columns are the ones its entry
+query sums, so the documents of a cell add up to the cell. Documents are
+returned a page at a time, ordered by (date, name) and continued with that
+pair as the keyset.
+"""
+
+import frappe
+from frappe import _
+from frappe.query_builder import DocType
+from frappe.query_builder.functions import IfNull, Sum
+from frappe.utils import cint, getdate
+
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.period_cache import (
+    SUB_GROUP_SEPARATOR,
+)
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.tree_cache import get_group_tree
+
+REPORT_NAME = "Custom Sales Analytic Report"
+
+PAGE_LENGTH = 20
+MAX_PAGE_LENGTH = 500
+
+# (value, quantity) line measure of the trees the report reads per line
+LINE_MEASURES = {
+    "Item": ("base_net_amount", "stock_qty"),
+    "Item Group": ("base_net_amount", "qty"),
+}
+HEADER_MEASURES = ("base_net_total", "total_qty")
+
+# trees whose entry query leaves out opening invoices
+EXCLUDE_OPENING_TREE_TYPES = ("Supplier", "Supplier Group", "Territory", "Project")
+
+ORDER_TYPE_ROOT = "Order Types"
+
+
+@frappe.whitelist()
+def get_cell_documents(
+    filters, entity, period_slot, prior=0, after_date=None, after_name=None, page_length=None, customer=None
+):
+    """
+    One page of the documents summed into (`entity`, `period_slot`); `prior` picks
+    last year's cell in comparison mode. Customer rows of the Customer Group tree
+    pass their `customer` id. Pass the `next` keyset of a page as after_date /
+    after_name to get the following one.
+    """
+    from customvinodreports.vinodreports.report.custom_sales_analytic_report.custom_sales_analytic_report import (
+        FACT_MEASURES,
+        SUPPLIER_TREE_TYPES,
+        Analytics,
+    )
+
+    if not frappe.get_doc("Report", REPORT_NAME).is_permitted():
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+    analytics = Analytics(frappe.parse_json(filters))
+    # the Others row sums the rows left off the page, it is no node of the tree
+    if entity == analytics.others_labels[0]:
+        frappe.throw(_("Drill-down is not available for the Others row"))
+    analytics.update_company_list_for_parent_company()
+    analytics.build_period_index()
+
+    prior = cint(prior)
+    if prior and not analytics.compare:
+        frappe.throw(_("Last year's cells exist only in comparison mode"))
+    period_index = analytics.prior_index if prior else analytics.period_index
+
+    slot = cint(period_slot)
+    if not 0 <= slot < len(period_index):
+        frappe.throw(_("Period {0} is outside the report range").format(period_slot))
+
+    tree_type = analytics.filters.tree_type
+    # facts are summed per line; they hold no document names, so read the lines they come from
+    line_level = analytics.use_fact_table or tree_type in LINE_MEASURES
+    analytics.use_fact_table = False
+
+    doctype = DocType(analytics.filters.doc_type)
+    doctype_item = DocType(f"{analytics.filters.doc_type} Item")
+    date_column = doctype[analytics.date_field]
+
+    query = frappe.qb.from_(doctype)
+    if line_level:
+        query = query.join(doctype_item).on(doctype_item.parent == doctype.name)
+
+    query, entity_condition = get_entity_condition(tree_type, query, doctype, doctype_item, entity, customer)
+
+    value_field, qty_field = LINE_MEASURES.get(tree_type, HEADER_MEASURES)
+    if line_level:
+        value_field = FACT_MEASURES.get(value_field, value_field)
+        qty_field = FACT_MEASURES.get(qty_field, qty_field)
+    measure_columns = analytics.get_measure_columns(
+        doctype_item if line_level else doctype, value_field, qty_field
+    )
+
+    from_date, to_date = period_index.start_dates[slot], period_index.end_dates[slot]
+    query = query.where(
+        analytics.get_header_conditions(doctype, exclude_opening=tree_type in EXCLUDE_OPENING_TREE_TYPES)
+        & date_column.between(from_date, to_date)
+        & entity_condition
+    )
+
+    if after_name:
+        after_date = getdate(after_date)
+        query = query.where(
+            (date_column > after_date) | ((date_column == after_date) & (doctype.name > after_name))
+        )
+
+    party_field = "supplier" if tree_type in SUPPLIER_TREE_TYPES else "customer"
+    page_length = min(cint(page_length) or PAGE_LENGTH, MAX_PAGE_LENGTH)
+
+    query = query.select(
+        doctype.name,
+        date_column.as_("posting_date"),
+        doctype[party_field].as_("party"),
+        *[(Sum(column) if line_level else column).as_(alias) for alias, column in measure_columns.items()],
+    )
+    if line_level:
+        query = query.groupby(doctype.name, date_column, doctype[party_field])
+
+    documents = query.orderby(date_column).orderby(doctype.name).limit(page_length + 1).run(as_dict=True)
+
+    next_page = None
+    if len(documents) > page_length:
+        documents = documents[:page_length]
+        next_page = {"after_date": documents[-1].posting_date, "after_name": documents[-1].name}
+
+    # the part of the period inside the report range
+    if prior:
+        report_from, report_to = analytics.prior_from_date, analytics.prior_to_date
+    else:
+        report_from, report_to = getdate(analytics.filters.from_date), getdate(analytics.filters.to_date)
+
+    return {
+        "doctype": analytics.filters.doc_type,
+        "from_date": max(from_date, report_from),
+        "to_date": min(to_date, report_to),
+        "documents": documents,
+        "next": next_page,
+    }
+
+
+def get_entity_condition(tree_type, query, doctype, doctype_item, entity, customer_id=None):
+    """(query with any joins the node needs, condition selecting the entries of the node)"""
+    if tree_type == "Customer":
+        # a customer without sub group is its own row; one with a sub group only has the sub-group row
+        customer = DocType("Customer")
+        query = query.join(customer).on(doctype.customer == customer.name)
+        name, _separator, sub_group = entity.partition(SUB_GROUP_SEPARATOR)
+        if sub_group:
+            return query, (doctype.customer == name) & (customer.custom_sub_group == sub_group)
+        return query, (doctype.customer == name) & (IfNull(customer.custom_sub_group, "") == "")
+
+    if tree_type == "Customer Group":
+        # customer rows are labelled "CUST-001 - Customer Name" and send their id along
+        if customer_id:
+            return query, doctype.customer == customer_id
+
+        customer = DocType("Customer")
+        query = query.join(customer).on(doctype.customer == customer.name)
+        group, _separator, sub_group = entity.partition(SUB_GROUP_SEPARATOR)
+        if sub_group:
+            return query, (customer.customer_group == group) & (customer.custom_sub_group == sub_group)
+        return query, customer.customer_group.isin(get_subtree(tree_type, entity, throw=True))
+
+    if tree_type == "Supplier Group":
+        supplier = DocType("Supplier")
+        query = query.join(supplier).on(doctype.supplier == supplier.name)
+        return query, supplier.supplier_group.isin(get_subtree(tree_type, entity, throw=True))
+
+    if tree_type == "Territory":
+        return query, doctype.territory.isin(get_subtree(tree_type, entity, throw=True))
+
+    if tree_type == "Item Group":
+        return query, doctype_item.item_group.isin(get_subtree(tree_type, entity, throw=True))
+
+    if tree_type == "Order Type":
+        if entity == ORDER_TYPE_ROOT:
+            return query, IfNull(doctype.order_type, "") != ""
+        return query, doctype.order_type == entity
+
+    if tree_type == "Item":
+        return query, doctype_item.item_code == entity
+
+    if tree_type == "Project":
+        return query, doctype.project == entity
+
+    if tree_type == "Supplier":
+        return query, doctype.supplier == entity
+
+    frappe.throw(_("Drill-down is not available for tree type {0}").format(tree_type))
+
+
+def get_subtree(tree_type, group, throw=False):
+    """Names of `group` and all of its descendants, the nodes a group row sums"""
+    group_entries, _depth_map = get_group_tree(tree_type)
+    node = next((d for d in group_entries if d.name == group), None)
+    if not node:
+        if throw:
+            frappe.throw(_("{0} {1} not found").format(_(tree_type), group))
+        return []
+    return [d.name for d in group_entries if node.lft <= d.lft and d.rgt <= node.rgt]
+
@@ -0,0 +1,134 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+"""
+Streamed CSV / XLSX export of Custom Sales Analytic Report.
+
+The rows are generated one at a time from the aggregated matrix instead of
+being collected in `data`. CSV goes to the response as it is written. XLSX
+goes through a write-only workbook that keeps its rows in temporary files and
+is then streamed from disk. Tree indent levels are kept: as leading spaces in
+CSV and as the cell indent in XLSX.
+"""
+
+import csv
+import io
+import tempfile
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import cint, nowdate
+from werkzeug.wrappers import Response
+
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.result_cache import OUTPUT_FILTERS
+
+REPORT_NAME = "Custom Sales Analytic Report"
+
+# bytes collected before a piece of the body is handed to the server
+CHUNK_BYTES = 64 * 1024
+INDENT = "    "
+
+
+@frappe.whitelist()
+def export_report(filters, file_format="CSV"):
+    """Whole report (every Item / Project row, no "Others") as a CSV or XLSX download"""
+    from customvinodreports.vinodreports.report.custom_sales_analytic_report.custom_sales_analytic_report import (
+        Analytics,
+    )
+
+    if not frappe.get_doc("Report", REPORT_NAME).is_permitted():
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+    if file_format not in ("CSV", "XLSX"):
+        frappe.throw(_("File format must be CSV or XLSX"))
+
+    # paging, top-N and sort filters of the grid would leave one page plus an "Others" row
+    filters = {key: value for key, value in frappe.parse_json(filters).items() if key not in OUTPUT_FILTERS}
+    analytics = Analytics(filters)
+    # the whole range and every row: an export is never cut short or paged
+    analytics.started_at = time.monotonic()
+    analytics.time_budget = None
+    analytics.row_limit = None
+
+    analytics.update_company_list_for_parent_company()
+    analytics.build_period_index()
+    analytics.get_columns()
+    analytics.load_cached_periods()
+
+    columns = analytics.columns
+    rows = analytics.iter_rows() if analytics.collect_data() else iter(())
+
+    filename = f"{frappe.scrub(REPORT_NAME)}_{nowdate()}"
+    if file_format == "CSV":
+        # rows come from the in-memory matrix and values Analytics resolved up front
+        # (translated labels), so they can still be produced while the body streams
+        # after the request has been torn down
+        body, mimetype, filename = iter_csv(columns, rows), "text/csv", f"{filename}.csv"
+    else:
+        body = iter_file(write_xlsx(columns, rows))
+        mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        filename = f"{filename}.xlsx"
+
+    return Response(
+        body,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        direct_passthrough=True,
+    )
+
+
+def get_values(columns, row, indent_text=True):
+    values = [row.get(column["fieldname"]) for column in columns]
+    indent = cint(row.get("indent"))
+    if indent_text and indent:
+        values[0] = f"{INDENT * indent}{values[0]}"
+    return values
+
+
+def iter_csv(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # BOM, so spreadsheet programs read the file as UTF-8
+    buffer.write("\ufeff")
+    writer.writerow([column["label"] for column in columns])
+
+    for row in rows:
+        writer.writerow(get_values(columns, row))
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+def write_xlsx(columns, rows):
+    """Temporary file holding the workbook, rewound to the start"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(_("Sales Analytics"))
+    sheet.append([column["label"] for column in columns])
+
+    for row in rows:
+        values = get_values(columns, row, indent_text=False)
+        indent = cint(row.get("indent"))
+        if indent:
+            cell = WriteOnlyCell(sheet, value=values[0])
+            cell.alignment = Alignment(indent=indent)
+            values[0] = cell
+        sheet.append(values)
+
+    file = tempfile.TemporaryFile()
+    workbook.save(file)
+    file.seek(0)
+    return file
+
+
+def iter_file(file):
+    with file:
+        while chunk := file.read(CHUNK_BYTES):
+            yield chunk
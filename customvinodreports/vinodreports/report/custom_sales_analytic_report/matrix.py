@@ -0,0 +1,143 @@
+# Copyright (c) 2025, sai and contributors
+# For license information, please see license.txt
+
+import numpy as np
+
+
+class EntityPeriodMatrix:
+    """
+    Dense entity x period aggregation core for the analytics report.
+
+    Entities (groups, sub-group nodes, customers, items ...) are mapped to row
+    indices in first-seen order, period slots of the `PeriodIndex` are the
+    columns and all values live in one float64 array, so totals and roll-ups
+    are plain NumPy sums instead of nested dict walks.
+
+    With several measures (e.g. value and quantity) each period has one column
+    per measure, interleaved: column `slot * measures + measure`.
+    """
+
+    def __init__(self, period_count, capacity=64, measures=1):
+        self.period_count = period_count
+        self.measures = measures
+        self.entities = []
+        self.row_by_entity = {}
+        self.values = np.zeros((capacity, self.width))
+
+    @property
+    def width(self):
+        return self.period_count * self.measures
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __contains__(self, entity):
+        return entity in self.row_by_entity
+
+    def get_row_index(self, entity):
+        """Row index of `entity`, allocating a zero row the first time it is seen"""
+        index = self.row_by_entity.get(entity)
+        if index is None:
+            index = len(self.entities)
+            if index == len(self.values):
+                self.values = np.vstack([self.values, np.zeros_like(self.values)])
+            self.entities.append(entity)
+            self.row_by_entity[entity] = index
+        return index
+
+    def add(self, entities, slots, amounts):
+        """
+        Accumulate `amounts[i]` into (`entities[i]`, `slots[i]`) in one vectorized call.
+        With several measures `amounts[i]` holds one amount per measure.
+        """
+        if not entities:
+            return
+
+        rows = np.fromiter((self.get_row_index(e) for e in entities), dtype=np.intp, count=len(entities))
+        columns = np.asarray(slots, dtype=np.intp)[:, None] * self.measures + np.arange(self.measures)
+        amounts = np.asarray(amounts, dtype=float).reshape(len(entities), self.measures)
+        np.add.at(self.values, (rows[:, None], columns), amounts)
+
+    def truncate(self, period_count):
+        """Keep only the first `period_count` period columns"""
+        self.period_count = period_count
+        self.values = self.values[:, : self.width].copy()
+
+    def merge(self, other):
+        """Add every row of `other`, which has at least as many period columns, into this matrix"""
+        if not len(other):
+            return
+
+        rows = np.fromiter((self.get_row_index(e) for e in other.entities), dtype=np.intp, count=len(other))
+        np.add.at(self.values, rows, other.values[: len(other), : self.width])
+
+    def get_slot_values(self, slot):
+        """(entities, values) of the entities with amounts in `slot`; values has one column per measure"""
+        block = self.values[: len(self.entities), slot * self.measures : (slot + 1) * self.measures]
+        rows = np.flatnonzero(block.any(axis=1))
+        return [self.entities[index] for index in rows], block[rows].copy()
+
+    def add_row(self, target, source):
+        """Add the whole period vector of `source` into `target`"""
+        if source not in self.row_by_entity:
+            return
+        target_index = self.get_row_index(target)
+        self.values[target_index] += self.values[self.row_by_entity[source]]
+
+    def get(self, entity):
+        """Period vector of `entity`; zeros when the entity has no entries"""
+        index = self.row_by_entity.get(entity)
+        if index is None:
+            return np.zeros(self.width)
+        return self.values[index]
+
+    def get_total(self, entity):
+        """Total of `entity` per measure"""
+        return self.measure_totals(self.get(entity))
+
+    def measure_totals(self, values):
+        """Sum of a period vector per measure"""
+        return values.reshape(-1, self.measures).sum(axis=0)
+
+    def row_totals(self):
+        """Per-entity totals per measure, aligned with `entities`"""
+        rows = self.values[: len(self.entities)]
+        return rows.reshape(len(rows), -1, self.measures).sum(axis=1)
+
+    def column_totals(self, entities=None):
+        """Per-period totals over `entities` (default: every row)"""
+        if entities is None:
+            return self.values[: len(self.entities)].sum(axis=0)
+        rows = [self.row_by_entity[e] for e in entities if e in self.row_by_entity]
+        return self.values[rows].sum(axis=0)
+
+
+def rollup_nested_set(own_values, lfts, rgts):
+    """
+    Subtree totals for every node of a nested-set tree.
+
+    `own_values` is a 2-D array whose rows are in `lft` order (preorder). One
+    forward pass over lft/rgt with a stack of open ancestors gives each node
+    its parent and depth; children are then added into their parents level by
+    level, deepest first, with one `np.add.at` per level. Returns
+    (totals, depths).
+    """
+    count = len(lfts)
+    parents = np.full(count, -1, dtype=np.intp)
+    depths = np.zeros(count, dtype=np.intp)
+
+    stack = []
+    for index in range(count):
+        while stack and rgts[stack[-1]] < lfts[index]:
+            stack.pop()
+        if stack:
+            parents[index] = stack[-1]
+            depths[index] = depths[stack[-1]] + 1
+        stack.append(index)
+
+    totals = np.array(own_values, dtype=float)
+    for depth in range(int(depths.max(initial=0)), 0, -1):
+        nodes = np.flatnonzero(depths == depth)
+        np.add.at(totals, parents[nodes], totals[nodes])
+
+    return totals, depths
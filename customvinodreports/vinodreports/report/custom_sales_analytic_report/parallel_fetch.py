@@ -0,0 +1,111 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+"""
+Parallel fetch of the analytics entries, one company per worker process.
+
+Each worker connects to the site with its own database connection, runs the
+fetch half of `Analytics` for a single company and sends back its entity x
+period matrix together with the lookups built along the way. The parent
+merges them into its own matrix and builds the rows exactly as it does after
+a serial fetch.
+"""
+
+import atexit
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import frappe
+
+# lookups filled while fetching: plain value maps, first value seen wins
+SHARD_MAPS = ("entity_names", "customer_labels", "stock_uom_map")
+# lookups of sets, merged by union
+SHARD_SET_MAPS = ("sub_group_map", "customer_map")
+
+
+def fetch_in_parallel(analytics):
+    """Fill `analytics.matrix` and its lookups from one worker per company"""
+    companies = list(analytics.filters.company)
+    time_budget = None
+    if analytics.time_budget:
+        time_budget = max(analytics.time_budget - (time.monotonic() - analytics.started_at), 0.001)
+
+    # spawn, not fork: a forked child would share the parent's DB and Redis sockets
+    with ProcessPoolExecutor(
+        max_workers=min(analytics.parallel_workers, len(companies)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(frappe.local.site, frappe.local.sites_path),
+    ) as executor:
+        shards = list(
+            executor.map(
+                fetch_company_shard,
+                [dict(analytics.filters)] * len(companies),
+                companies,
+                [frappe.session.user] * len(companies),
+                [getattr(analytics, "job_key", None)] * len(companies),
+                [time_budget] * len(companies),
+                [list(analytics.cached_periods)] * len(companies),
+            )
+        )
+
+    # a worker that ran out of time kept fewer periods; keep what every company has
+    period_count = min(matrix.period_count for matrix, _lookups in shards)
+    if period_count < len(analytics.period_index):
+        analytics.truncate_periods(period_count)
+
+    for matrix, lookups in shards:
+        analytics.matrix.merge(matrix)
+        merge_lookups(analytics, lookups)
+
+
+def merge_lookups(analytics, lookups):
+    for attr in SHARD_MAPS:
+        if lookups.get(attr) is not None:
+            target = analytics.__dict__.setdefault(attr, {})
+            for key, value in lookups[attr].items():
+                target.setdefault(key, value)
+
+    for attr in SHARD_SET_MAPS:
+        if lookups.get(attr) is not None:
+            target = analytics.__dict__.setdefault(attr, {})
+            for key, values in lookups[attr].items():
+                target.setdefault(key, set()).update(values)
+
+
+# ------------------------------------------------------------------
+# WORKER
+# ------------------------------------------------------------------
+
+
+def init_worker(site, sites_path):
+    frappe.init(site=site, sites_path=sites_path)
+    frappe.connect()
+    # spawned workers exit through sys.exit when the pool shuts down, which runs atexit handlers
+    atexit.register(frappe.destroy)
+
+
+def fetch_company_shard(filters, company, user, job_key, time_budget, cached_slots):
+    """(matrix, lookups) of the entries of `company`; periods follow the full company list"""
+    from customvinodreports.vinodreports.report.custom_sales_analytic_report.custom_sales_analytic_report import (
+        Analytics,
+    )
+
+    frappe.set_user(user)
+
+    analytics = Analytics({**filters, "parallel_workers": 1})
+    analytics.filters.company = [company]
+    analytics.job_key = job_key
+    analytics.started_at = time.monotonic()
+    analytics.time_budget = time_budget
+    # periods the parent already has from the period cache
+    analytics.cached_periods = dict.fromkeys(cached_slots)
+
+    analytics.build_period_index()
+    analytics.get_columns()
+    analytics.init_periodic_data()
+    analytics.fetch_data()
+
+    lookups = {attr: getattr(analytics, attr, None) for attr in SHARD_MAPS + SHARD_SET_MAPS}
+    return analytics.matrix, lookups
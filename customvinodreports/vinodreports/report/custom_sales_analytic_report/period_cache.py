@@ -0,0 +1,128 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+"""
+Cache of closed periods of the analytics report.
+
+A period whose end date has passed changes only through backdated
+submissions and cancellations. Its matrix column is therefore kept per
+(filters without the dates, period bounds). A run that moves to_date forward
+reads the closed periods from here and queries only the open ones. A change
+to a transaction drops just the periods whose range covers its date.
+"""
+
+import time
+
+import frappe
+from frappe.utils import getdate
+
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.result_cache import (
+    KEY_FILTERS,
+    add_to_index,
+    clear_entries,
+    delete_covered_entries,
+    evict_least_recently_used,
+    get_cache_key,
+    mark_used,
+)
+
+PERIOD_KEY = "custom_sales_analytics_period"
+INDEX_KEY = "custom_sales_analytics_period_index"
+
+# most recently used periods kept; older ones are evicted
+MAX_ENTRIES = 5000
+# longer than a result: a closed period only changes through backdated documents
+EXPIRES_IN_SEC = 24 * 60 * 60
+
+SUB_GROUP_SEPARATOR = "::SUB::"
+
+
+def get_period_meta(filters, date_ranges):
+    """
+    Normalised filters identifying one period; `date_ranges` are the (from, to)
+    ranges the period reads: its part of the report range, and last year's in
+    comparison mode
+    """
+    meta = {key: filters.get(key) for key in KEY_FILTERS}
+    meta.update(
+        {
+            "companies": sorted(filters.company),
+            "date_ranges": [[str(getdate(start)), str(getdate(end))] for start, end in date_ranges],
+        }
+    )
+    return meta
+
+
+def get_cached_period(filters, date_ranges):
+    """(entities, values, lookups) of a cached period, or None"""
+    meta = get_period_meta(filters, date_ranges)
+    key = get_cache_key(meta)
+
+    period = frappe.cache.get_value(f"{PERIOD_KEY}:{key}")
+    if period is None:
+        return None
+
+    mark_used(INDEX_KEY, key, meta)
+    return period
+
+
+def set_cached_periods(filters, periods):
+    """Store (date_ranges, entities, values, lookups) of each closed period of a run"""
+    for date_ranges, entities, values, lookups in periods:
+        meta = get_period_meta(filters, date_ranges)
+        key = get_cache_key(meta)
+
+        frappe.cache.set_value(
+            f"{PERIOD_KEY}:{key}",
+            (entities, values, slice_lookups(lookups, entities)),
+            expires_in_sec=EXPIRES_IN_SEC,
+        )
+        meta["last_used"] = time.time()
+        add_to_index(INDEX_KEY, key, meta)
+
+    evict_least_recently_used(PERIOD_KEY, INDEX_KEY, MAX_ENTRIES)
+
+
+def slice_lookups(lookups, entities):
+    """
+    The part of the run's lookups that belongs to the entities of one period.
+    Lookups are keyed by entity, or by the customer / group of a sub-group node.
+    """
+    entity_set = set(entities)
+    keys = entity_set | {entity.split(SUB_GROUP_SEPARATOR)[0] for entity in entities}
+
+    sliced = {}
+    for attr, lookup in lookups.items():
+        if lookup is None:
+            continue
+
+        if attr == "sub_group_map":
+            sliced[attr] = {
+                key: {sg for sg in sgs if f"{key}{SUB_GROUP_SEPARATOR}{sg}" in entity_set}
+                for key, sgs in lookup.items()
+                if key in keys
+            }
+        elif attr == "customer_map":
+            sliced[attr] = {
+                key: customers & entity_set for key, customers in lookup.items() if key in keys
+            }
+        else:
+            sliced[attr] = {key: value for key, value in lookup.items() if key in keys}
+
+    return sliced
+
+
+def invalidate(doc_type, company, posting_date):
+    """Drop every cached period of `doc_type` whose date ranges cover the change"""
+    posting_date = str(getdate(posting_date))
+    delete_covered_entries(
+        PERIOD_KEY,
+        INDEX_KEY,
+        doc_type,
+        company,
+        lambda meta: any(start <= posting_date <= end for start, end in meta.get("date_ranges", [])),
+    )
+
+
+def clear_period_cache():
+    clear_entries(PERIOD_KEY, INDEX_KEY)
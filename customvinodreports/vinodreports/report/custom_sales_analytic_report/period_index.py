@@ -0,0 +1,46 @@
+# Copyright (c) 2025, sai and contributors
+# For license information, please see license.txt
+
+from bisect import bisect_left
+from datetime import timedelta
+
+from frappe import scrub
+
+ONE_DAY = timedelta(days=1)
+
+
+class PeriodIndex:
+    """
+    Column slots of the analytics report, built once from `periodic_daterange`.
+
+    Slot `i` covers `start_dates[i]` .. `end_dates[i]`. Labels and scrubbed
+    fieldnames are computed up front so that entries and cells map to a slot
+    with a bisect instead of formatting a period string per row.
+    """
+
+    def __init__(self, first_start_date, end_dates, labels):
+        self.end_dates = list(end_dates)
+        self.start_dates = [first_start_date] + [
+            end_date + ONE_DAY for end_date in self.end_dates[:-1]
+        ]
+        self.labels = list(labels)
+        self.fieldnames = [scrub(label) for label in self.labels]
+
+    def __len__(self):
+        return len(self.end_dates)
+
+    def get_slot(self, date):
+        """Return the slot `date` falls in, or None when it lies outside the report range"""
+        if not date or date < self.start_dates[0]:
+            return None
+
+        slot = bisect_left(self.end_dates, date)
+        return slot if slot < len(self.end_dates) else None
+
+    def truncated(self, period_count):
+        """Index over the first `period_count` slots only"""
+        return PeriodIndex(self.start_dates[0], self.end_dates[:period_count], self.labels[:period_count])
+
+    def columns(self):
+        """(label, fieldname) pairs in column order"""
+        return zip(self.labels, self.fieldnames, strict=True)
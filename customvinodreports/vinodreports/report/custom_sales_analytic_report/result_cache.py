@@ -0,0 +1,184 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+import hashlib
+import json
+import time
+
+import frappe
+from frappe.utils import getdate
+
+RESULT_KEY = "custom_sales_analytics_result"
+# every entry, for eviction; each entry is also indexed under every (doc_type, company) it reads,
+# so invalidating a document reads only the entries of its bucket
+INDEX_KEY = "custom_sales_analytics_result_index"
+
+# most recently used results kept; older ones are evicted
+MAX_ENTRIES = 200
+# upper bound on staleness for changes no hook sees (e.g. a customer moved to another group)
+EXPIRES_IN_SEC = 6 * 60 * 60
+
+# filters that change the result of Analytics.run
+KEY_FILTERS = ("tree_type", "doc_type", "value_quantity", "range", "compare_with_previous_year")
+# filters that only pick which rows of the result are returned, or how the chart is drawn
+OUTPUT_FILTERS = (
+    "top_n",
+    "sort_by_total",
+    "start",
+    "page_length",
+    "after_total",
+    "after_entity",
+    "chart_top_n",
+    "chart_max_points",
+)
+
+
+def get_cache_meta(filters):
+    """Normalised filters identifying a result; `filters.company` must already be expanded"""
+    meta = {key: filters.get(key) for key in KEY_FILTERS + OUTPUT_FILTERS}
+    meta.update(
+        {
+            "from_date": str(getdate(filters.from_date)),
+            "to_date": str(getdate(filters.to_date)),
+            # earliest date read: a year before from_date in comparison mode
+            "scan_from_date": str(getdate(filters.get("scan_from_date") or filters.from_date)),
+            "companies": sorted(filters.company),
+        }
+    )
+    return meta
+
+
+def get_cache_key(meta):
+    return hashlib.md5(json.dumps(meta, sort_keys=True).encode()).hexdigest()
+
+
+def get_cached_result(filters):
+    meta = get_cache_meta(filters)
+    key = get_cache_key(meta)
+
+    result = frappe.cache.get_value(f"{RESULT_KEY}:{key}")
+    if result is None:
+        return None
+
+    mark_used(INDEX_KEY, key, meta)
+    return result
+
+
+def set_cached_result(filters, result):
+    meta = get_cache_meta(filters)
+    key = get_cache_key(meta)
+
+    frappe.cache.set_value(f"{RESULT_KEY}:{key}", result, expires_in_sec=EXPIRES_IN_SEC)
+    meta["last_used"] = time.time()
+    add_to_index(INDEX_KEY, key, meta)
+
+    evict_least_recently_used(RESULT_KEY, INDEX_KEY, MAX_ENTRIES)
+
+
+# ------------------------------------------------------------------
+# INDEX, shared with the period cache and the sales cube
+# ------------------------------------------------------------------
+# Each cache keeps its values under `value_key:<key>` and their meta in the hash
+# `index_key`, and in one bucket per (doc_type, company) the entry reads.
+
+
+def get_bucket_key(index_key, doc_type, company):
+    return f"{index_key}:{doc_type}:{company}"
+
+
+def get_bucket(index_key, doc_type, company):
+    """{key: meta} of the entries that read `doc_type` of `company`"""
+    return frappe.cache.hgetall(get_bucket_key(index_key, doc_type, company)) or {}
+
+
+def add_to_index(index_key, key, meta):
+    frappe.cache.hset(index_key, key, meta)
+    for company in meta["companies"]:
+        frappe.cache.hset(get_bucket_key(index_key, meta["doc_type"], company), key, meta)
+
+
+def remove_from_index(index_key, key, meta):
+    frappe.cache.hdel(index_key, key)
+    for company in meta.get("companies", []):
+        frappe.cache.hdel(get_bucket_key(index_key, meta.get("doc_type"), company), key)
+
+
+def mark_used(index_key, key, meta):
+    meta["last_used"] = time.time()
+    frappe.cache.hset(index_key, key, meta)
+
+
+def delete_entry(value_key, index_key, key, meta):
+    if isinstance(key, bytes):
+        key = key.decode()
+    frappe.cache.delete_value(f"{value_key}:{key}")
+    remove_from_index(index_key, key, meta)
+
+
+def evict_least_recently_used(value_key, index_key, max_entries):
+    index = frappe.cache.hgetall(index_key) or {}
+    if len(index) <= max_entries:
+        return
+
+    by_age = sorted(index.items(), key=lambda item: item[1].get("last_used") or 0)
+    for key, meta in by_age[: len(index) - max_entries]:
+        delete_entry(value_key, index_key, key, meta)
+
+
+def delete_covered_entries(value_key, index_key, doc_type, company, covers):
+    """Drop the entries reading `doc_type` of `company` for which `covers(meta)` is true"""
+    for key, meta in get_bucket(index_key, doc_type, company).items():
+        if covers(meta):
+            delete_entry(value_key, index_key, key, meta)
+
+
+def clear_entries(value_key, index_key):
+    for key, meta in (frappe.cache.hgetall(index_key) or {}).items():
+        delete_entry(value_key, index_key, key, meta)
+
+
+def invalidate(doc_type, company, posting_date):
+    """Drop every cached result of `doc_type` whose companies and date range cover the change"""
+    posting_date = str(getdate(posting_date))
+    delete_covered_entries(
+        RESULT_KEY,
+        INDEX_KEY,
+        doc_type,
+        company,
+        lambda meta: meta.get("scan_from_date", meta["from_date"]) <= posting_date <= meta["to_date"],
+    )
+
+    # closed periods cached for incremental runs, and sales cubes
+    from customvinodreports.vinodreports.report.custom_sales_analytic_report.period_cache import (
+        invalidate as invalidate_periods,
+    )
+    from customvinodreports.vinodreports.report.custom_sales_analytic_report.sales_cube import (
+        invalidate as invalidate_cubes,
+    )
+
+    invalidate_periods(doc_type, company, posting_date)
+    invalidate_cubes(doc_type, company, posting_date)
+
+
+def invalidate_for_document(doc, method=None):
+    """
+    on_submit / on_cancel of Sales Invoice, Delivery Note and Sales Order.
+    Runs after commit so a report executed meanwhile cannot cache the old state.
+    """
+    date_field = "transaction_date" if doc.doctype == "Sales Order" else "posting_date"
+    frappe.db.after_commit.add(
+        lambda: invalidate(doc.doctype, doc.company, doc.get(date_field))
+    )
+
+
+def clear_result_cache():
+    from customvinodreports.vinodreports.report.custom_sales_analytic_report.period_cache import (
+        clear_period_cache,
+    )
+    from customvinodreports.vinodreports.report.custom_sales_analytic_report.sales_cube import (
+        clear_cube_cache,
+    )
+
+    clear_entries(RESULT_KEY, INDEX_KEY)
+    clear_period_cache()
+    clear_cube_cache()
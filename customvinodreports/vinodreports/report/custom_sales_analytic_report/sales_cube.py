@@ -0,0 +1,116 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+"""
+Short-lived cache of the sales cube: line-level sales of one
+(doc_type, company set, date range, range) summed per customer, territory,
+project, item, item group, order type and period bucket.
+
+Each tree type except the supplier trees is a projection of these rows, so
+flipping tree_type on the same selection is served from the cube without a
+new scan. The cube is only built when it will be cached and is likely to be
+reused. Entries expire after a few minutes, and the invalidation hooks drop
+them sooner when a covered document changes.
+"""
+
+import time
+
+import frappe
+from frappe.utils import getdate
+
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.result_cache import (
+    KEY_FILTERS,
+    add_to_index,
+    clear_entries,
+    delete_covered_entries,
+    delete_entry,
+    get_cache_key,
+)
+
+CUBE_KEY = "custom_sales_analytics_cube"
+INDEX_KEY = "custom_sales_analytics_cube_index"
+# tree types recently run on a selection; a second one makes the cube worth building
+SEEN_KEY = "custom_sales_analytics_cube_seen"
+
+EXPIRES_IN_SEC = 10 * 60
+# larger cubes are used for the run that built them but not cached
+MAX_ROWS = 250000
+
+# tree types that are projections of the cube
+CUBE_TREE_TYPES = ("Customer", "Customer Group", "Territory", "Item Group", "Item", "Project", "Order Type")
+# tree types whose own query already reads the lines, so building the cube costs them little more
+LINE_TREE_TYPES = ("Item Group", "Item")
+
+# (value, quantity) cube measure of each tree type; header totals are the sums of their lines
+CUBE_MEASURES = {
+    "Item": ("base_net_amount", "stock_qty"),
+}
+DEFAULT_CUBE_MEASURES = ("base_net_amount", "qty")
+
+# the tree type is a projection and the measure is picked per tree, so neither is part of the key
+CUBE_KEY_FILTERS = tuple(key for key in KEY_FILTERS if key not in ("tree_type", "value_quantity"))
+
+
+def get_cube_meta(filters):
+    meta = {key: filters.get(key) for key in CUBE_KEY_FILTERS}
+    meta.update(
+        {
+            "from_date": str(getdate(filters.from_date)),
+            "to_date": str(getdate(filters.to_date)),
+            "scan_from_date": str(getdate(filters.get("scan_from_date") or filters.from_date)),
+            "companies": sorted(filters.company),
+        }
+    )
+    return meta
+
+
+def get_cached_cube(filters):
+    """Cube rows for the selection, or None"""
+    return frappe.cache.get_value(f"{CUBE_KEY}:{get_cache_key(get_cube_meta(filters))}")
+
+
+def has_cached_cube(filters):
+    return frappe.cache.exists(f"{CUBE_KEY}:{get_cache_key(get_cube_meta(filters))}")
+
+
+def get_other_tree_types(filters):
+    """Other tree types run on this selection within the cube lifetime; records this one"""
+    key = f"{SEEN_KEY}:{get_cache_key(get_cube_meta(filters))}"
+    seen = frappe.cache.get_value(key) or []
+    if filters.tree_type not in seen:
+        frappe.cache.set_value(key, [*seen, filters.tree_type], expires_in_sec=EXPIRES_IN_SEC)
+    return [tree_type for tree_type in seen if tree_type != filters.tree_type]
+
+
+def set_cached_cube(filters, rows):
+    meta = get_cube_meta(filters)
+    key = get_cache_key(meta)
+
+    remove_expired()
+    frappe.cache.set_value(f"{CUBE_KEY}:{key}", rows, expires_in_sec=EXPIRES_IN_SEC)
+    meta["expires_at"] = time.time() + EXPIRES_IN_SEC
+    add_to_index(INDEX_KEY, key, meta)
+
+
+def remove_expired():
+    """Index entries of cubes Redis has already expired"""
+    now = time.time()
+    for key, meta in (frappe.cache.hgetall(INDEX_KEY) or {}).items():
+        if meta.get("expires_at", 0) < now:
+            delete_entry(CUBE_KEY, INDEX_KEY, key, meta)
+
+
+def invalidate(doc_type, company, posting_date):
+    """Drop every cube of `doc_type` whose companies and date range cover the change"""
+    posting_date = str(getdate(posting_date))
+    delete_covered_entries(
+        CUBE_KEY,
+        INDEX_KEY,
+        doc_type,
+        company,
+        lambda meta: meta["scan_from_date"] <= posting_date <= meta["to_date"],
+    )
+
+
+def clear_cube_cache():
+    clear_entries(CUBE_KEY, INDEX_KEY)
@@ -0,0 +1,144 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+import unittest
+from datetime import date, timedelta
+
+import frappe
+import numpy as np
+from frappe.utils import getdate
+
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.custom_sales_analytic_report import (
+    JOB_RESULT_KEY,
+    Analytics,
+    pop_job_result,
+)
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.matrix import EntityPeriodMatrix
+
+# entity -> (period 0, period 1); ITEM-C / ITEM-D and ITEM-F / ITEM-G tie on their totals
+AMOUNTS = {
+    "ITEM-A": (50, 10),
+    "ITEM-B": (5, 5),
+    "ITEM-C": (20, 20),
+    "ITEM-D": (40, 0),
+    "ITEM-E": (100, 0),
+    "ITEM-F": (1, 2),
+    "ITEM-G": (3, 0),
+    "ITEM-H": (0, 7),
+}
+
+
+class TestSelectRows(unittest.TestCase):
+    def get_analytics(self, **filters):
+        # select_rows only reads the filters, the matrix and the row limit
+        analytics = Analytics.__new__(Analytics)
+        analytics.filters = frappe._dict(filters)
+        analytics.row_limit = None
+        analytics.matrix = EntityPeriodMatrix(2)
+        for entity, values in AMOUNTS.items():
+            analytics.matrix.add([entity, entity], [0, 1], values)
+        return analytics
+
+    def get_page(self, **filters):
+        analytics = self.get_analytics(**filters)
+        indexes, others = analytics.select_rows()
+        entities = [analytics.matrix.entities[index] for index in indexes]
+
+        # the page and the Others row always add up to the unpaged grand totals
+        shown = analytics.matrix.values[indexes].sum(axis=0) if indexes else np.zeros(2)
+        if others is not None:
+            count, values = others
+            self.assertEqual(count + len(indexes), len(AMOUNTS))
+            shown = shown + values
+        np.testing.assert_array_equal(shown, analytics.matrix.column_totals())
+
+        return entities, others
+
+    def test_unpaged(self):
+        entities, others = self.get_page()
+
+        self.assertEqual(entities, list(AMOUNTS))
+        self.assertIsNone(others)
+
+    def test_row_limit(self):
+        analytics = self.get_analytics()
+        analytics.row_limit = 3
+        indexes, others = analytics.select_rows()
+
+        self.assertEqual([analytics.matrix.entities[index] for index in indexes], ["ITEM-E", "ITEM-A", "ITEM-C"])
+        self.assertEqual(others[0], 5)
+
+    def test_top_n(self):
+        entities, others = self.get_page(top_n=3)
+
+        # by total descending, then entity: ITEM-C (40) comes before ITEM-D (40)
+        self.assertEqual(entities, ["ITEM-E", "ITEM-A", "ITEM-C"])
+        self.assertEqual(others[0], 5)
+        np.testing.assert_array_equal(others[1], [49, 14])
+
+    def test_keyset_pages(self):
+        seen, after = [], {}
+        while True:
+            entities, _others = self.get_page(page_length=3, **after)
+            if not entities:
+                break
+
+            self.assertFalse(set(entities) & set(seen), "pages overlap")
+            seen.extend(entities)
+            last = entities[-1]
+            after = {"after_total": sum(AMOUNTS[last]), "after_entity": last}
+
+        # every row exactly once, in (total desc, entity asc) order
+        expected = sorted(AMOUNTS, key=lambda entity: (-sum(AMOUNTS[entity]), entity))
+        self.assertEqual(seen, expected)
+
+    def test_keyset_matches_offset_pages(self):
+        first, _others = self.get_page(page_length=4)
+        second, _others = self.get_page(page_length=4, start=4)
+        last = first[-1]
+        after, _others = self.get_page(page_length=4, after_total=sum(AMOUNTS[last]), after_entity=last)
+
+        self.assertEqual(after, second)
+        self.assertEqual(len(first + second), len(AMOUNTS))
+
+    def test_keyset_tie_on_total(self):
+        # ITEM-C and ITEM-D both total 40; a page ending on ITEM-C must start the next one at ITEM-D
+        entities, _others = self.get_page(page_length=1, after_total=40, after_entity="ITEM-C")
+
+        self.assertEqual(entities, ["ITEM-D"])
+
+
+class TestPeriodDateRanges(unittest.TestCase):
+    def get_analytics(self, **filters):
+        analytics = Analytics.__new__(Analytics)
+        analytics.filters = frappe._dict(filters)
+        analytics.compare = 0
+        analytics.get_period_date_ranges()
+        analytics.build_period_index()
+        return analytics
+
+    def test_weekly_range_of_53_weeks(self):
+        # a fiscal year starting on a Tuesday touches 53 Monday-based weeks, one more than the report shows
+        analytics = self.get_analytics(range="Weekly", from_date="2025-04-01", to_date="2026-03-31")
+        self.assertEqual(len(analytics.period_index), 52)
+        self.assertEqual(analytics.periodic_daterange[-1], date(2026, 3, 29))
+
+        # the queries stop with the last period, so 30 - 31 Mar never reach a missing bucket
+        condition = analytics.get_date_condition(frappe.qb.DocType("Sales Invoice").posting_date)
+        end_date = getdate(condition.end.value)
+        self.assertEqual(end_date, date(2026, 3, 29))
+
+        day = getdate(analytics.filters.from_date)
+        while day <= end_date:
+            self.assertIsNotNone(analytics.period_index.get_slot(day), day)
+            day += timedelta(days=1)
+
+
+class TestJobResult(unittest.TestCase):
+    def test_pop_job_result(self):
+        # kept apart from the result cache, which document changes may clear meanwhile
+        frappe.cache.set_value(f"{JOB_RESULT_KEY}:test-job", ["columns", "data"])
+
+        self.assertEqual(pop_job_result("test-job"), ["columns", "data"])
+        # handed over once, to the run that follows the job
+        self.assertIsNone(pop_job_result("test-job"))
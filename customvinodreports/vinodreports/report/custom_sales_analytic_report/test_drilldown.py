@@ -0,0 +1,27 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+import unittest
+
+import frappe
+from frappe.query_builder import DocType
+
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.drilldown import get_entity_condition
+
+
+class TestEntityCondition(unittest.TestCase):
+    def test_customer_row_filters_on_its_id(self):
+        # named by full name plus company abbreviation; the label does not split back into the id
+        doctype, doctype_item = DocType("Sales Invoice"), DocType("Sales Invoice Item")
+        _query, condition = get_entity_condition(
+            "Customer Group",
+            frappe.qb.from_(doctype),
+            doctype,
+            doctype_item,
+            "Jane Doe - JD - Jane Doe",
+            "Jane Doe - JD",
+        )
+
+        sql = str(condition)
+        self.assertIn("'Jane Doe - JD'", sql)
+        self.assertNotIn("'Jane Doe'", sql)
@@ -0,0 +1,118 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+import unittest
+
+import numpy as np
+
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.matrix import (
+    EntityPeriodMatrix,
+    rollup_nested_set,
+)
+
+
+class TestEntityPeriodMatrix(unittest.TestCase):
+    def test_add(self):
+        matrix = EntityPeriodMatrix(3)
+        matrix.add(["a", "b", "a"], [0, 2, 0], [1.5, 2, 3])
+
+        self.assertEqual(matrix.entities, ["a", "b"])
+        np.testing.assert_array_equal(matrix.get("a"), [4.5, 0, 0])
+        np.testing.assert_array_equal(matrix.get("b"), [0, 0, 2])
+        np.testing.assert_array_equal(matrix.get("missing"), [0, 0, 0])
+
+    def test_add_grows_past_capacity(self):
+        matrix = EntityPeriodMatrix(2, capacity=2)
+        matrix.add([f"e{i}" for i in range(5)], [1] * 5, range(5))
+
+        self.assertEqual(len(matrix), 5)
+        np.testing.assert_array_equal(matrix.column_totals(), [0, 10])
+
+    def test_add_several_measures(self):
+        matrix = EntityPeriodMatrix(2, measures=2)
+        matrix.add(["a", "a", "b"], [0, 1, 1], [[10, 1], [20, 2], [5, 3]])
+
+        # columns are interleaved per period: (p0 m0, p0 m1, p1 m0, p1 m1)
+        np.testing.assert_array_equal(matrix.get("a"), [10, 1, 20, 2])
+        np.testing.assert_array_equal(matrix.get_total("a"), [30, 3])
+        np.testing.assert_array_equal(matrix.row_totals(), [[30, 3], [5, 3]])
+
+        entities, values = matrix.get_slot_values(0)
+        self.assertEqual(entities, ["a"])
+        np.testing.assert_array_equal(values, [[10, 1]])
+
+    def test_merge(self):
+        matrix = EntityPeriodMatrix(2)
+        matrix.add(["a"], [0], [1])
+
+        other = EntityPeriodMatrix(3)
+        other.add(["a", "c", "c"], [1, 0, 2], [2, 3, 4])
+        matrix.merge(other)
+
+        self.assertEqual(matrix.entities, ["a", "c"])
+        np.testing.assert_array_equal(matrix.get("a"), [1, 2])
+        # the third period of `other` is beyond this matrix and left out
+        np.testing.assert_array_equal(matrix.get("c"), [3, 0])
+
+        matrix.merge(EntityPeriodMatrix(2))
+        self.assertEqual(len(matrix), 2)
+
+    def test_truncate(self):
+        matrix = EntityPeriodMatrix(3, measures=2)
+        matrix.add(["a"], [2], [[1, 1]])
+        matrix.add(["a"], [0], [[4, 2]])
+        matrix.truncate(2)
+
+        self.assertEqual(matrix.width, 4)
+        np.testing.assert_array_equal(matrix.get("a"), [4, 2, 0, 0])
+
+        matrix.add(["b"], [1], [[7, 1]])
+        np.testing.assert_array_equal(matrix.get("b"), [0, 0, 7, 1])
+
+    def test_column_totals(self):
+        matrix = EntityPeriodMatrix(2)
+        matrix.add(["a", "b", "c"], [0, 1, 1], [1, 2, 3])
+
+        np.testing.assert_array_equal(matrix.column_totals(), [1, 5])
+        np.testing.assert_array_equal(matrix.column_totals(["a", "c", "missing"]), [1, 3])
+        np.testing.assert_array_equal(matrix.column_totals([]), [0, 0])
+
+    def test_add_row(self):
+        matrix = EntityPeriodMatrix(2)
+        matrix.add(["child"], [1], [5])
+        matrix.add_row("parent", "child")
+        matrix.add_row("parent", "missing")
+
+        np.testing.assert_array_equal(matrix.get("parent"), [0, 5])
+
+
+class TestRollupNestedSet(unittest.TestCase):
+    def test_rollup(self):
+        # root
+        #   a
+        #     a1
+        #     a2
+        #   b
+        lfts = [1, 2, 3, 5, 8]
+        rgts = [10, 7, 4, 6, 9]
+        own_values = np.array([[1, 0], [10, 0], [100, 1], [1000, 2], [0, 5]], dtype=float)
+
+        totals, depths = rollup_nested_set(own_values, lfts, rgts)
+
+        np.testing.assert_array_equal(depths, [0, 1, 2, 2, 1])
+        # rows stay in the preorder they came in, each with its whole subtree
+        np.testing.assert_array_equal(totals, [[1111, 8], [1110, 3], [100, 1], [1000, 2], [0, 5]])
+        # the input is left untouched
+        np.testing.assert_array_equal(own_values[0], [1, 0])
+
+    def test_several_roots(self):
+        totals, depths = rollup_nested_set(np.array([[1.0], [2.0], [4.0]]), [1, 2, 5], [4, 3, 6])
+
+        np.testing.assert_array_equal(depths, [0, 1, 0])
+        np.testing.assert_array_equal(totals, [[3], [2], [4]])
+
+    def test_empty_tree(self):
+        totals, depths = rollup_nested_set(np.zeros((0, 2)), [], [])
+
+        self.assertEqual(totals.shape, (0, 2))
+        self.assertEqual(len(depths), 0)
@@ -0,0 +1,54 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+import unittest
+from datetime import date
+
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.period_index import PeriodIndex
+
+
+class TestPeriodIndex(unittest.TestCase):
+    def setUp(self):
+        # Monthly, Jan - Mar 2025
+        self.index = PeriodIndex(
+            date(2025, 1, 1),
+            [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31)],
+            ["Jan 2025", "Feb 2025", "Mar 2025"],
+        )
+
+    def test_slot_boundaries(self):
+        self.assertEqual(self.index.get_slot(date(2025, 1, 1)), 0)
+        self.assertEqual(self.index.get_slot(date(2025, 1, 31)), 0)
+        self.assertEqual(self.index.get_slot(date(2025, 2, 1)), 1)
+        self.assertEqual(self.index.get_slot(date(2025, 2, 28)), 1)
+        self.assertEqual(self.index.get_slot(date(2025, 3, 1)), 2)
+        self.assertEqual(self.index.get_slot(date(2025, 3, 31)), 2)
+
+    def test_dates_outside_the_range(self):
+        self.assertIsNone(self.index.get_slot(date(2024, 12, 31)))
+        self.assertIsNone(self.index.get_slot(date(2025, 4, 1)))
+        self.assertIsNone(self.index.get_slot(None))
+
+    def test_start_dates(self):
+        self.assertEqual(self.index.start_dates, [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)])
+
+    def test_weekly_year_crossing_week(self):
+        # Mon 30 Dec 2024 - Sun 5 Jan 2025 is ISO week 1 of 2025; its first two days
+        # are in 2024 and used to get a "Week 1 2024" label no column had
+        index = PeriodIndex(
+            date(2024, 12, 23),
+            [date(2024, 12, 29), date(2025, 1, 5), date(2025, 1, 12)],
+            ["Week 52 2024", "Week 1 2025", "Week 2 2025"],
+        )
+        for day in (date(2024, 12, 30), date(2024, 12, 31), date(2025, 1, 1), date(2025, 1, 5)):
+            self.assertEqual(index.get_slot(day), 1)
+            self.assertEqual(index.labels[index.get_slot(day)], "Week 1 2025")
+        self.assertEqual(index.get_slot(date(2024, 12, 29)), 0)
+        self.assertEqual(index.get_slot(date(2025, 1, 6)), 2)
+
+    def test_truncated(self):
+        truncated = self.index.truncated(2)
+        self.assertEqual(len(truncated), 2)
+        self.assertEqual(truncated.get_slot(date(2025, 2, 15)), 1)
+        self.assertIsNone(truncated.get_slot(date(2025, 3, 1)))
+        self.assertEqual(list(truncated.columns()), [("Jan 2025", "jan_2025"), ("Feb 2025", "feb_2025")])
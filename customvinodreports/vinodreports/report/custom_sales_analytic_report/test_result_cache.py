@@ -0,0 +1,62 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+import unittest
+
+import frappe
+
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.result_cache import (
+    add_to_index,
+    clear_entries,
+    delete_covered_entries,
+    evict_least_recently_used,
+    get_bucket,
+)
+
+VALUE_KEY = "test_custom_sales_analytics_entry"
+INDEX_KEY = "test_custom_sales_analytics_entry_index"
+
+
+class TestCacheIndex(unittest.TestCase):
+    def setUp(self):
+        # key -> (companies, last used)
+        for key, companies, last_used in (
+            ("a", ["_Test Company"], 1),
+            ("b", ["_Test Company", "_Test Company 1"], 2),
+            ("c", ["_Test Company 1"], 3),
+        ):
+            frappe.cache.set_value(f"{VALUE_KEY}:{key}", key)
+            add_to_index(
+                INDEX_KEY, key, {"doc_type": "Sales Invoice", "companies": companies, "last_used": last_used}
+            )
+
+    def tearDown(self):
+        clear_entries(VALUE_KEY, INDEX_KEY)
+
+    def get_keys(self):
+        return sorted(
+            key.decode() if isinstance(key, bytes) else key for key in frappe.cache.hgetall(INDEX_KEY) or {}
+        )
+
+    def test_evict_least_recently_used(self):
+        evict_least_recently_used(VALUE_KEY, INDEX_KEY, 2)
+
+        self.assertEqual(self.get_keys(), ["b", "c"])
+        self.assertIsNone(frappe.cache.get_value(f"{VALUE_KEY}:a"))
+        self.assertNotIn("a", get_bucket(INDEX_KEY, "Sales Invoice", "_Test Company"))
+
+    def test_delete_covered_entries(self):
+        # only the bucket of the changed company is read
+        delete_covered_entries(
+            VALUE_KEY, INDEX_KEY, "Sales Invoice", "_Test Company 1", lambda meta: meta["last_used"] > 2
+        )
+
+        self.assertEqual(self.get_keys(), ["a", "b"])
+        self.assertIsNone(frappe.cache.get_value(f"{VALUE_KEY}:c"))
+        self.assertEqual(frappe.cache.get_value(f"{VALUE_KEY}:b"), "b")
+
+    def test_clear_entries(self):
+        clear_entries(VALUE_KEY, INDEX_KEY)
+
+        self.assertEqual(self.get_keys(), [])
+        self.assertEqual(get_bucket(INDEX_KEY, "Sales Invoice", "_Test Company 1"), {})
@@ -0,0 +1,48 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+import unittest
+
+import frappe
+import numpy as np
+
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.matrix import rollup_nested_set
+from customvinodreports.vinodreports.report.custom_sales_analytic_report.tree_cache import (
+    get_depth_map,
+    number_order_type_tree,
+)
+
+
+class TestOrderTypeTree(unittest.TestCase):
+    def get_group_entries(self):
+        # as the order type query returns them: the root, then every order type with lft = rgt = 1
+        return [
+            frappe._dict(name="Order Types", lft=0, rgt=2, parent=""),
+            frappe._dict(name="Maintenance", lft=1, rgt=1, parent="Order Types"),
+            frappe._dict(name="Sales", lft=1, rgt=1, parent="Order Types"),
+            frappe._dict(name="Shopping Cart", lft=1, rgt=1, parent="Order Types"),
+        ]
+
+    def test_numbering(self):
+        group_entries = self.get_group_entries()
+        number_order_type_tree(group_entries)
+
+        self.assertEqual([(d.lft, d.rgt) for d in group_entries], [(0, 7), (1, 2), (3, 4), (5, 6)])
+
+    def test_rollup(self):
+        group_entries = self.get_group_entries()
+        number_order_type_tree(group_entries)
+
+        totals, depths = rollup_nested_set(
+            np.array([[0.0], [1.0], [2.0], [4.0]]),
+            [d.lft for d in group_entries],
+            [d.rgt for d in group_entries],
+        )
+
+        # siblings are disjoint: each order type keeps its own total and the root sums them
+        np.testing.assert_array_equal(totals, [[7], [1], [2], [4]])
+        np.testing.assert_array_equal(depths, [0, 1, 1, 1])
+        self.assertEqual(
+            get_depth_map(group_entries),
+            {"Order Types": 0, "Maintenance": 1, "Sales": 1, "Shopping Cart": 1},
+        )
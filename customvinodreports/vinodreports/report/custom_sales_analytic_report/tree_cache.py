@@ -0,0 +1,143 @@
+# Copyright (c) 2026, sai and contributors
+# For license information, please see license.txt
+
+"""
+Process-level cache of the tree metadata the analytics report needs on every
+run: group trees with their depth maps, company subsidiary lists and the known
+order types.
+
+Entries live in this worker's memory. Each kind of metadata has a version
+token in Redis. Hooks on the source doctypes replace that token, so every
+worker notices the change on its next run at the cost of one cache read per
+kind.
+"""
+
+import frappe
+
+VERSION_KEY = "custom_sales_analytics_tree_version"
+
+GROUP_PARENT_FIELDS = {
+    "Territory": "parent_territory",
+    "Customer Group": "parent_customer_group",
+    "Item Group": "parent_item_group",
+    "Supplier Group": "parent_supplier_group",
+}
+
+_cache = {}
+
+
+def get_cached(kind, name, builder):
+    """Value of `builder()` for (kind, name), rebuilt when the version of `kind` changed"""
+    version = frappe.cache.get_value(f"{VERSION_KEY}:{kind}")
+    key = (frappe.local.site, kind, name)
+
+    hit = _cache.get(key)
+    if hit and hit[0] == version:
+        return hit[1]
+
+    value = builder()
+    _cache[key] = (version, value)
+    return value
+
+
+def invalidate(kind):
+    frappe.cache.set_value(f"{VERSION_KEY}:{kind}", frappe.generate_hash(length=12))
+
+
+def invalidate_tree_cache(doc, method=None, *args, **kwargs):
+    """on_update / on_trash / after_rename of the group doctypes and Company"""
+    invalidate(doc.doctype)
+
+
+def update_known_order_types(doc, method=None):
+    """on_submit of Sales Order: a new order type adds a node to the Order Type tree"""
+    if doc.order_type and doc.order_type not in get_known_order_types(doc.doctype):
+        invalidate("Order Type")
+
+
+# ------------------------------------------------------------------
+# ACCESSORS
+# ------------------------------------------------------------------
+
+
+def get_group_tree(tree_type):
+    """(group_entries ordered by lft, depth_map) of a nested-set group doctype"""
+    return get_cached(tree_type, tree_type, lambda: build_group_tree(tree_type))
+
+
+def get_order_type_tree(doc_type):
+    """(group_entries, depth_map) of the synthetic "Order Types" tree of `doc_type`"""
+    return get_cached("Order Type", doc_type, lambda: build_order_type_tree(doc_type))
+
+
+def get_known_order_types(doc_type):
+    return [d.name for d in get_order_type_tree(doc_type)[0] if d.parent]
+
+
+def get_company_list(company, include_subsidiaries=False):
+    """`company` followed by all its child companies when it is a group and they are requested"""
+    if not include_subsidiaries:
+        return [company]
+    # child companies are read with user permissions applied, so cache them per user
+    return list(get_cached("Company", (company, frappe.session.user), lambda: build_company_list(company)))
+
+
+# ------------------------------------------------------------------
+# BUILDERS
+# ------------------------------------------------------------------
+
+
+def build_group_tree(tree_type):
+    parent = GROUP_PARENT_FIELDS[tree_type]
+
+    group_entries = frappe.db.sql(
+        f"""select name, lft, rgt , {parent} as parent
+        from `tab{tree_type}` order by lft""",
+        as_dict=1,
+    )
+    return group_entries, get_depth_map(group_entries)
+
+
+def build_order_type_tree(doc_type):
+    group_entries = frappe.db.sql(
+        f""" select * from (select "Order Types" as name, 0 as lft,
+        2 as rgt, '' as parent union select distinct order_type as name, 1 as lft, 1 as rgt, "Order Types" as parent
+        from `tab{doc_type}` where ifnull(order_type, '') != '') as b order by lft, name
+    """,
+        as_dict=1,
+    )
+
+    number_order_type_tree(group_entries)
+    return group_entries, get_depth_map(group_entries)
+
+
+def number_order_type_tree(group_entries):
+    """
+    The query only tells the root from its children; number them as a proper
+    nested set so the lft/rgt roll-up sees siblings as disjoint
+    """
+    for index, d in enumerate(group_entries[1:]):
+        d.lft, d.rgt = 2 * index + 1, 2 * index + 2
+    group_entries[0].rgt = 2 * len(group_entries) - 1
+
+
+def build_company_list(company):
+    company_list = [company]
+
+    is_group, lft, rgt = frappe.db.get_value("Company", company, ["is_group", "lft", "rgt"]) or (0, 0, 0)
+    if is_group:
+        company_list.extend(
+            frappe.db.get_list("Company", filters={"lft": [">", lft], "rgt": ["<", rgt]}, pluck="name")
+        )
+
+    return company_list
+
+
+def get_depth_map(group_entries):
+    depth_map = frappe._dict()
+    for d in group_entries:
+        if d.parent:
+            depth_map.setdefault(d.name, depth_map.get(d.parent) + 1)
+        else:
+            depth_map.setdefault(d.name, 0)
+    return depth_map
@@ -1,5 +1,11 @@
 import frappe
 
+from customvinodreports.vinodreports.doctype.report_performance_sample.report_performance_sample import (
+    instrument_report,
+)
+
+
+@instrument_report("Item Rate")
 def execute(filters=None):
     data = frappe.db.sql("""
         SELECT
@@ -2,8 +2,12 @@
 # For license information, please see license.txt
 
 # import frappe
+from customvinodreports.vinodreports.doctype.report_performance_sample.report_performance_sample import (
+	instrument_report,
+)
 
 
+@instrument_report("Sales Person Custom Report")
 def execute(filters=None):
 	columns, data = [], []
 	return columns, data